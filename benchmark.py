@@ -0,0 +1,250 @@
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from lector import leer_casos_texto, parsear_caso, formatear_resultado
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Archivos de casos incluidos en el repositorio, según su formato
+DATOS = {
+    "P3": ["P3_cases_Def.in", "prueba_1.in", "prueba_2.in", "prueba_3.in", "x.in",
+           "test_case_1000_cells.txt"],
+    "P2": ["P2_cases.in", "small.in", "y.in"],
+}
+
+FASES = ("parseo", "grafo", "resolver", "salida")
+
+
+def _celulas(texto, campos):
+    # Los péptidos empiezan después de `campos` columnas numéricas (3 en P3, 4 en P2)
+    n, d, filas = parsear_caso(texto)
+    celulas = [(int(fila[0]), int(fila[1]), int(fila[2]), set(fila[campos:])) for fila in filas]
+    return d, celulas
+
+
+def _grafo(caso):
+    from grafo import construir_grafo
+    d, celulas = caso
+    return construir_grafo(celulas, d)
+
+
+def _numero_cliques(resultado):
+    return len(set(resultado.values()))
+
+
+def _asignar(grafo, cliques):
+    return {grafo.ids[nodo]: k for k, clique in enumerate(cliques, 1) for nodo in clique}
+
+
+def _solver_cliques(modulo, funcion, formato="P3"):
+    """
+    Solver de cobertura por cliques: `funcion(modulo, grafo)` devuelve el
+    número de clique de cada célula, por id.
+    """
+    campos = 3 if formato == "P3" else 4
+    return {
+        "formato": formato,
+        "modulo": modulo,
+        "parseo": lambda texto: _celulas(texto, campos),
+        "grafo": _grafo,
+        "resolver": funcion,
+        "salida": lambda m, resultado: formatear_resultado(resultado),
+        "calidad": _numero_cliques,
+    }
+
+
+def _red_p2(caso):
+    import p2
+    n, d, columnas, offsets, peptidos = caso
+    return p2.build_network(n, d, columnas, offsets, peptidos), columnas[0]
+
+
+def _resolver_p2(p2, red):
+    (graph, source, sink, calculators), ids = red
+    return p2.solve_network(graph, source, sink, ids, calculators)
+
+
+SOLVERS = {
+    "greedy_final": _solver_cliques("greedy_final", lambda m, grafo: m.cubrir_grafo(grafo)),
+    "new": _solver_cliques("new", lambda m, grafo: m.clique_aproximation(grafo)),
+    "greedy_brayan": _solver_cliques("greedy_brayan", lambda m, grafo: m.componentes_clique(grafo)),
+    "greedy2": _solver_cliques("greedy2", lambda m, grafo: _asignar(grafo, m.greedy_clique_cover(grafo))),
+    # greedy.py lee archivos P2 e ignora el tipo de célula
+    "greedy": _solver_cliques("greedy", lambda m, grafo: _asignar(grafo, [
+        clique for componente in m.componentes_conexas(grafo)
+        for clique in m.minimum_clique_cover(grafo, componente)
+    ]), formato="P2"),
+    "p2": {
+        "formato": "P2",
+        "modulo": "p2",
+        "parseo": lambda texto: importlib.import_module("p2").parse_case(texto),
+        "grafo": _red_p2,
+        "resolver": _resolver_p2,
+        "salida": lambda m, r: f"{r[0]} {r[1]} {r[2]}\n",
+        # En P2 se reporta la suma del flujo que queda al bloquear la mejor calculadora
+        "calidad": lambda r: r[2],
+    },
+}
+
+
+def medir(nombre, archivo):
+    """
+    Resuelve todos los casos de `archivo` con el solver `nombre` y devuelve
+    el tiempo de cada fase, la calidad y un hash de la salida.
+    """
+    solver = SOLVERS[nombre]
+    modulo = importlib.import_module(solver["modulo"])
+    tiempos = dict.fromkeys(FASES, 0.0)
+    calidad = 0
+    resumen = hashlib.sha1()
+    casos = 0
+
+    inicio = time.perf_counter()
+    with open(os.path.join(DIRECTORIO, archivo), "rb") as flujo:
+        for texto in leer_casos_texto(flujo):
+            t0 = time.perf_counter()
+            caso = solver["parseo"](texto)
+            t1 = time.perf_counter()
+            estructura = solver["grafo"](caso)
+            t2 = time.perf_counter()
+            resultado = solver["resolver"](modulo, estructura)
+            t3 = time.perf_counter()
+            salida = solver["salida"](modulo, resultado)
+            t4 = time.perf_counter()
+
+            tiempos["parseo"] += t1 - t0
+            tiempos["grafo"] += t2 - t1
+            tiempos["resolver"] += t3 - t2
+            tiempos["salida"] += t4 - t3
+            calidad += solver["calidad"](resultado)
+            resumen.update(salida.encode())
+            casos += 1
+
+    return {
+        "casos": casos,
+        "tiempos": tiempos,
+        "total": time.perf_counter() - inicio,
+        "calidad": calidad,
+        "hash_salida": resumen.hexdigest(),
+    }
+
+
+def _ejecutar(nombre, archivo):
+    """
+    Mide un solver en un proceso nuevo y agrega su pico de memoria residente (KB).
+    """
+    proceso = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--medir", nombre, archivo],
+                               stdout=subprocess.PIPE, cwd=DIRECTORIO)
+    salida = proceso.stdout.read()
+    proceso.stdout.close()
+    _, estado, uso = os.wait4(proceso.pid, 0)
+    proceso.returncode = os.waitstatus_to_exitcode(estado)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"{nombre} falló con {archivo} (código {proceso.returncode})")
+
+    medicion = json.loads(salida)
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    medicion["rss_pico_kb"] = uso.ru_maxrss // 1024 if sys.platform == "darwin" else uso.ru_maxrss
+    return medicion
+
+
+def _resumir(mediciones):
+    """
+    Combina las repeticiones: mediana y mínimo de cada tiempo, pico de memoria máximo.
+    """
+    primera = mediciones[0]
+    return {
+        "casos": primera["casos"],
+        "calidad": primera["calidad"],
+        "hash_salida": primera["hash_salida"],
+        "salida_estable": all(m["hash_salida"] == primera["hash_salida"] for m in mediciones),
+        "tiempos": {
+            fase: {
+                "mediana": statistics.median(m["tiempos"][fase] for m in mediciones),
+                "minimo": min(m["tiempos"][fase] for m in mediciones),
+            }
+            for fase in FASES
+        },
+        "total": {
+            "mediana": statistics.median(m["total"] for m in mediciones),
+            "minimo": min(m["total"] for m in mediciones),
+        },
+        "rss_pico_kb": max(m["rss_pico_kb"] for m in mediciones),
+    }
+
+
+def _commit():
+    try:
+        proceso = subprocess.run(["git", "rev-parse", "HEAD"], cwd=DIRECTORIO,
+                                 capture_output=True, text=True, check=True)
+        return proceso.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide los solvers con los archivos de casos del repositorio.")
+    parser.add_argument("--solvers", nargs="+", choices=sorted(SOLVERS), default=sorted(SOLVERS),
+                        help="solvers a medir")
+    parser.add_argument("--datos", nargs="+", default=None,
+                        help="archivos de casos del repositorio (por defecto todos los del formato de cada "
+                             "solver); cada solver se mide solo con los de su formato")
+    parser.add_argument("--repeticiones", type=int, default=3,
+                        help="veces que se mide cada solver con cada archivo")
+    parser.add_argument("--salida", default=None,
+                        help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--medir", nargs=2, metavar=("SOLVER", "ARCHIVO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        json.dump(medir(*args.medir), sys.stdout)
+        return
+
+    # Un archivo que ningún solver elegido puede leer no se mediría con ninguno
+    formatos = sorted({SOLVERS[nombre]["formato"] for nombre in args.solvers})
+    for archivo in args.datos or []:
+        if not any(archivo in DATOS[formato] for formato in formatos):
+            validos = [nombre for formato in formatos for nombre in DATOS[formato]]
+            parser.error(f"--datos: {archivo} no es ninguno de los archivos de casos de los "
+                         f"solvers elegidos ({', '.join(validos)})")
+
+    resultados = []
+    print(f"{'solver':14} {'archivo':26} {'parseo':>8} {'grafo':>8} {'resolver':>9} "
+          f"{'salida':>8} {'total':>8} {'RSS MB':>7} {'calidad':>9}")
+    for nombre in args.solvers:
+        formato = SOLVERS[nombre]["formato"]
+        for archivo in args.datos or DATOS[formato]:
+            if args.datos and archivo not in DATOS[formato]:
+                continue
+            mediciones = [_ejecutar(nombre, archivo) for _ in range(args.repeticiones)]
+            resumen = dict(solver=nombre, archivo=archivo, **_resumir(mediciones))
+            resultados.append(resumen)
+
+            tiempos = resumen["tiempos"]
+            print(f"{nombre:14} {archivo:26} "
+                  f"{tiempos['parseo']['mediana']:8.3f} {tiempos['grafo']['mediana']:8.3f} "
+                  f"{tiempos['resolver']['mediana']:9.3f} {tiempos['salida']['mediana']:8.3f} "
+                  f"{resumen['total']['mediana']:8.3f} {resumen['rss_pico_kb'] / 1024:7.1f} "
+                  f"{resumen['calidad']:9}", flush=True)
+
+    if args.salida:
+        with open(args.salida, "w") as salida:
+            json.dump({
+                "commit": _commit(),
+                "python": platform.python_version(),
+                "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "repeticiones": args.repeticiones,
+                "resultados": resultados,
+            }, salida, indent=2)
+
+
+if __name__ == "__main__":
+    main()
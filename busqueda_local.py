@@ -0,0 +1,146 @@
+import random
+import time
+
+from peptidos import popcount
+
+
+def _comunes(filas, miembros):
+    """
+    Nodos adyacentes a todos los miembros de un clique: los que pueden entrar en él.
+    """
+    comunes = -1
+    while miembros:
+        bajo = miembros & -miembros
+        comunes &= filas[bajo.bit_length() - 1]
+        miembros ^= bajo
+    return comunes
+
+
+def _fusionar(filas, cliques, comunes):
+    """
+    Une pares de cliques cuya unión sigue siendo un clique. Devuelve si hubo cambios.
+    """
+    cambio = False
+    a = 0
+    while a < len(cliques):
+        b = a + 1
+        while b < len(cliques):
+            if not cliques[b] & ~comunes[a]:
+                cliques[a] |= cliques[b]
+                comunes[a] &= comunes[b]
+                cliques[b] = cliques[-1]
+                comunes[b] = comunes[-1]
+                cliques.pop()
+                comunes.pop()
+                cambio = True
+            else:
+                b += 1
+        a += 1
+    return cambio
+
+
+def _vaciar(filas, cliques, comunes, c):
+    """
+    Intenta mover cada miembro del clique `c` a otro clique que lo acepte.
+    Si todos caben, el clique desaparece; si no, se deshacen los movimientos.
+    """
+    movidos = []
+    miembros = cliques[c]
+    while miembros:
+        bajo = miembros & -miembros
+        miembros ^= bajo
+        destino = -1
+        for otro in range(len(cliques)):
+            if otro != c and comunes[otro] & bajo:
+                destino = otro
+                break
+        if destino < 0:
+            for otro, nodo in reversed(movidos):
+                cliques[otro] &= ~nodo
+                comunes[otro] = _comunes(filas, cliques[otro])
+            return False
+        cliques[destino] |= bajo
+        comunes[destino] &= filas[bajo.bit_length() - 1]
+        movidos.append((destino, bajo))
+
+    cliques[c] = cliques[-1]
+    comunes[c] = comunes[-1]
+    cliques.pop()
+    comunes.pop()
+    return True
+
+
+def _mover_al_azar(filas, cliques, comunes, rng):
+    """
+    Movimiento lateral: pasa un nodo de un clique pequeño a otro clique que lo
+    acepte, sin cambiar el número de cliques, para abrir nuevas eliminaciones.
+    """
+    chicos = sorted(range(len(cliques)), key=lambda c: popcount(cliques[c]))[:3]
+    origen = rng.choice(chicos)
+    miembros = cliques[origen]
+    nodos = []
+    while miembros:
+        bajo = miembros & -miembros
+        nodos.append(bajo)
+        miembros ^= bajo
+    bajo = rng.choice(nodos)
+
+    destinos = [otro for otro in range(len(cliques)) if otro != origen and comunes[otro] & bajo]
+    if not destinos:
+        return
+    destino = rng.choice(destinos)
+    cliques[destino] |= bajo
+    comunes[destino] &= filas[bajo.bit_length() - 1]
+    cliques[origen] &= ~bajo
+    if cliques[origen]:
+        comunes[origen] = _comunes(filas, cliques[origen])
+    else:
+        cliques[origen] = cliques[-1]
+        comunes[origen] = comunes[-1]
+        cliques.pop()
+        comunes.pop()
+
+
+def mejorar_cobertura(filas, cliques, plazo, semilla=0):
+    """
+    Mejora una partición en cliques con búsqueda local hasta el instante
+    `plazo` (segundos de time.time()).
+
+    `cliques` es una lista de listas de nodos y `filas[v]` la máscara de
+    vecinos de v. Combina fusiones de cliques, intentos de vaciar los cliques
+    más chicos moviendo sus nodos y movimientos laterales al azar. La
+    partición es válida en todo momento; se devuelve la mejor encontrada.
+    """
+    rng = random.Random(semilla)
+    actuales = []
+    for clique in cliques:
+        mascara = 0
+        for v in clique:
+            mascara |= 1 << v
+        actuales.append(mascara)
+    comunes = [_comunes(filas, miembros) for miembros in actuales]
+    mejor = list(actuales)
+
+    while len(actuales) > 1 and time.time() < plazo:
+        mejoro = _fusionar(filas, actuales, comunes)
+        for c in sorted(range(len(actuales)), key=lambda c: popcount(actuales[c])):
+            if _vaciar(filas, actuales, comunes, c):
+                mejoro = True
+                break
+        if not mejoro:
+            _mover_al_azar(filas, actuales, comunes, rng)
+
+        # Después del movimiento al azar, que también puede vaciar un clique
+        if len(actuales) < len(mejor):
+            mejor = list(actuales)
+
+    return [_nodos(miembros) for miembros in mejor]
+
+
+def _nodos(mascara):
+    nodos = []
+    while mascara:
+        bajo = mascara & -mascara
+        nodos.append(bajo.bit_length() - 1)
+        mascara ^= bajo
+    return nodos
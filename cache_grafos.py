@@ -0,0 +1,139 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from grafo import GrafoCSR
+
+# Carpeta de la caché de grafos; None la desactiva. Los scripts la fijan con
+# la opción --cache.
+DIRECTORIO = None
+
+# Tamaño máximo de la carpeta; al pasarse se borran los grafos usados hace más tiempo.
+LIMITE_MB = 256
+
+# Cabecera de cada archivo: firma, orden de bytes de los arreglos y los
+# tamaños de ids (int64), offsets y adyacentes (int32). Mide 32 bytes para
+# que los arreglos queden alineados.
+_FIRMA = b"CSR2"
+_CABECERA = struct.Struct("<4sc3x3q")
+_ORDEN = b"<" if sys.byteorder == "little" else b">"
+_EXTENSION = ".csr"
+
+
+def configurar(directorio, limite_mb=LIMITE_MB):
+    """
+    Fija la carpeta de la caché (None la desactiva) y su tamaño máximo.
+    """
+    global DIRECTORIO, LIMITE_MB
+    DIRECTORIO = directorio
+    LIMITE_MB = limite_mb
+    if directorio is not None:
+        os.makedirs(directorio, exist_ok=True)
+
+
+def clave(texto, campos):
+    """
+    Clave de un caso: hash de su texto crudo, que empieza por la línea `n d`,
+    y del número de columnas numéricas antes de los péptidos.
+    """
+    return hashlib.sha256(b"%d\n" % campos + texto).hexdigest()
+
+
+def obtener(texto, campos, construir):
+    """
+    Devuelve el grafo del caso desde la caché, o lo construye con
+    `construir(texto)` y lo guarda. Sin caché solo llama a `construir`.
+    """
+    if DIRECTORIO is None:
+        return construir(texto)
+    ruta = os.path.join(DIRECTORIO, clave(texto, campos) + _EXTENSION)
+    grafo = cargar(ruta)
+    if grafo is None:
+        grafo = construir(texto)
+        guardar(ruta, grafo)
+        recortar()
+    return grafo
+
+
+def cargar(ruta):
+    """
+    Abre un grafo guardado con mmap, sin copiar sus arreglos, o devuelve None
+    si no existe o no se puede leer.
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapa) < _CABECERA.size:
+        mapa.close()
+        return None
+    firma, orden, *tamaños = _CABECERA.unpack_from(mapa)
+    n_ids, n_offsets, n_adyacentes = tamaños
+    tamaño = _CABECERA.size + 8 * n_ids + 4 * (n_offsets + n_adyacentes)
+    if firma != _FIRMA or orden != _ORDEN or len(mapa) != tamaño:
+        mapa.close()
+        return None
+
+    # Marca el archivo como recién usado para el orden LRU
+    try:
+        os.utime(ruta)
+    except OSError:
+        pass
+    return GrafoCSR.desde_compartido(memoryview(mapa)[_CABECERA.size:], tamaños)
+
+
+def guardar(ruta, grafo):
+    """
+    Escribe el grafo en `ruta`. Se escribe primero un archivo temporal y
+    luego se renombra, así otro proceso nunca ve un archivo a medias. Un
+    grafo con ids que no caben en 64 bits no se guarda.
+    """
+    try:
+        datos = grafo.a_bytes()
+    except OverflowError:
+        return
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(_CABECERA.pack(_FIRMA, _ORDEN, *grafo.tamaños()))
+            archivo.write(datos)
+        os.replace(temporal, ruta)
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+
+
+def recortar():
+    """
+    Borra los grafos usados hace más tiempo hasta que la carpeta no pase de LIMITE_MB.
+    """
+    archivos = []
+    total = 0
+    with os.scandir(DIRECTORIO) as entradas:
+        for entrada in entradas:
+            if not entrada.name.endswith(_EXTENSION):
+                continue
+            try:
+                estado = entrada.stat()
+            except OSError:
+                continue
+            archivos.append((estado.st_mtime, estado.st_size, entrada.path))
+            total += estado.st_size
+
+    limite = LIMITE_MB * 1024 * 1024
+    archivos.sort()
+    for _, tamaño, ruta in archivos:
+        if total <= limite:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+        total -= tamaño
@@ -0,0 +1,254 @@
+import time
+
+from peptidos import popcount
+
+
+def cota_inferior(filas, nodos=None):
+    """
+    Cota inferior del número de cliques: un conjunto independiente greedy.
+
+    Dos nodos no adyacentes nunca comparten clique, así que cada nodo del
+    conjunto independiente necesita un clique distinto. Se toman primero los
+    nodos de menor grado. Devuelve la máscara del conjunto encontrado.
+    """
+    if nodos is None:
+        nodos = range(len(filas))
+    independiente = 0
+    for v in sorted(nodos, key=lambda v: popcount(filas[v])):
+        if not filas[v] & independiente:
+            independiente |= 1 << v
+    return independiente
+
+
+def independiente_maximo(filas, limite_nodos=20000, limite_segundos=None):
+    """
+    Busca un conjunto independiente máximo (un clique máximo del complemento)
+    con ramificación y poda acotada por coloreo greedy, partiendo del conjunto
+    de cota_inferior. Si se exploran `limite_nodos` nodos o se agota
+    `limite_segundos` devuelve el mejor encontrado, que sigue siendo una cota
+    inferior válida.
+    """
+    limite = None if limite_segundos is None else time.perf_counter() + limite_segundos
+    n = len(filas)
+    todos = (1 << n) - 1
+    complemento = [todos & ~filas[v] & ~(1 << v) for v in range(n)]
+
+    mejor = [cota_inferior(filas)]
+    mejor_tam = [popcount(mejor[0])]
+    nodos = [0]
+
+    def expandir(actual, tam, candidatos):
+        # Cota por coloreo greedy de los candidatos en el complemento
+        colores = []
+        pendientes = candidatos
+        color = 0
+        while pendientes:
+            color += 1
+            disponibles = pendientes
+            while disponibles:
+                bajo = disponibles & -disponibles
+                v = bajo.bit_length() - 1
+                disponibles &= ~bajo & ~complemento[v]
+                pendientes &= ~bajo
+                colores.append((color, v))
+
+        for color, v in reversed(colores):
+            if tam + color <= mejor_tam[0] or nodos[0] >= limite_nodos:
+                return
+            nodos[0] += 1
+            if limite is not None and nodos[0] & 63 == 0 and time.perf_counter() > limite:
+                # Corta también las llamadas de más arriba
+                nodos[0] = limite_nodos
+                return
+            nuevo = actual | 1 << v
+            siguientes = candidatos & complemento[v]
+            if not siguientes:
+                if tam + 1 > mejor_tam[0]:
+                    mejor[0], mejor_tam[0] = nuevo, tam + 1
+            else:
+                expandir(nuevo, tam + 1, siguientes)
+            candidatos &= ~(1 << v)
+
+    expandir(0, 0, todos)
+    return mejor[0]
+
+
+def _cobertura_greedy(filas, limite=None):
+    """
+    Cobertura inicial con DSATUR sin retroceso: cada nodo va al clique más
+    lleno que lo acepte, empezando por el nodo con menos opciones.
+
+    Devuelve None si se pasa `limite` (instante de time.perf_counter()).
+    """
+    n = len(filas)
+    libres = (1 << n) - 1
+    cliques = []
+    while libres:
+        if limite is not None and time.perf_counter() > limite:
+            return None
+        v, opciones = _elegir_nodo(filas, cliques, libres)
+        if opciones:
+            c = max(opciones, key=lambda c: popcount(cliques[c]))
+            cliques[c] |= 1 << v
+        else:
+            cliques.append(1 << v)
+        libres &= ~(1 << v)
+    return cliques
+
+
+def _elegir_nodo(filas, cliques, libres):
+    """
+    Elige el nodo libre con menos cliques abiertos que lo acepten (mayor
+    saturación en el complemento); en empate, el de menos vecinos libres.
+    """
+    mejor = None
+    mejor_clave = None
+    mejor_opciones = None
+    pendientes = libres
+    while pendientes:
+        bajo = pendientes & -pendientes
+        v = bajo.bit_length() - 1
+        pendientes ^= bajo
+
+        fila = filas[v]
+        opciones = [c for c, miembros in enumerate(cliques) if not miembros & ~fila]
+        clave = (len(opciones), popcount(fila & libres))
+        if mejor_clave is None or clave < mejor_clave:
+            mejor, mejor_clave, mejor_opciones = v, clave, opciones
+            if not opciones:
+                break
+    return mejor, mejor_opciones
+
+
+def _cota_nodo(filas, cliques, libres):
+    """
+    Cota inferior en un nodo de la búsqueda: los cliques abiertos más un
+    conjunto independiente entre los nodos que ya no caben en ninguno.
+    """
+    independiente = 0
+    extra = 0
+    pendientes = libres
+    while pendientes:
+        bajo = pendientes & -pendientes
+        v = bajo.bit_length() - 1
+        pendientes ^= bajo
+
+        fila = filas[v]
+        if fila & independiente:
+            continue
+        if any(not miembros & ~fila for miembros in cliques):
+            continue
+        independiente |= bajo
+        extra += 1
+    return len(cliques) + extra
+
+
+def clique_cover_exacto(filas, limite_segundos=None, estadisticas=None, limite_nodos=None):
+    """
+    Encuentra una partición en el mínimo número de cliques (equivalente a
+    colorear el complemento) con ramificación tipo DSATUR y poda por cotas.
+
+    `filas[v]` es la máscara de vecinos del nodo v. La búsqueda usa una pila
+    explícita en lugar de recursión. Si se agota `limite_segundos` devuelve la
+    mejor partición encontrada hasta entonces; lo mismo si se visitan
+    `limite_nodos` nodos de la búsqueda, que a diferencia del tiempo no
+    depende de la carga de la máquina. El límite de tiempo vale también para
+    la cobertura inicial y la cota: si se agota antes de tener una cobertura,
+    cada nodo queda en su propio clique.
+
+    Devuelve (cliques, optimo): la lista de cliques, cada uno como lista de
+    nodos, y si la partición está probada como mínima. Si se pasa un dict en
+    `estadisticas` se acumula en "nodos_visitados" el número de nodos de la
+    búsqueda.
+    """
+    n = len(filas)
+    if n == 0:
+        return [], True
+
+    limite = None if limite_segundos is None else time.perf_counter() + limite_segundos
+    mejor = _cobertura_greedy(filas, limite)
+    if mejor is None:
+        return [[v] for v in range(n)], False
+    if limite is None:
+        cota = popcount(independiente_maximo(filas))
+    else:
+        cota = popcount(independiente_maximo(filas, limite_segundos=limite - time.perf_counter()))
+    visitados = 0
+    optimo = True
+
+    if len(mejor) > cota:
+        cliques = []
+        libres = (1 << n) - 1
+
+        # Cada marco de la pila: [nodo, opciones, siguiente opción, clique
+        # aplicado, si ese clique se abrió nuevo]. El clique aplicado es -1 si
+        # todavía no se asignó el nodo en este marco.
+        v, opciones = _elegir_nodo(filas, cliques, libres)
+        pila = [[v, opciones, 0, -1, False]]
+
+        while pila:
+            marco = pila[-1]
+            v, opciones, siguiente, aplicado, nuevo = marco
+
+            # Deshace la opción anterior de este marco
+            if aplicado >= 0:
+                if nuevo:
+                    cliques.pop()
+                else:
+                    cliques[aplicado] &= ~(1 << v)
+                libres |= 1 << v
+                marco[3] = -1
+
+            if siguiente > len(opciones):
+                pila.pop()
+                continue
+            marco[2] = siguiente + 1
+
+            if siguiente < len(opciones):
+                c = opciones[siguiente]
+                cliques[c] |= 1 << v
+            else:
+                # Abrir un clique nuevo solo si todavía puede mejorar
+                if len(cliques) + 1 >= len(mejor):
+                    continue
+                c = len(cliques)
+                cliques.append(1 << v)
+            libres &= ~(1 << v)
+            marco[3] = c
+            marco[4] = siguiente == len(opciones)
+
+            visitados += 1
+            if visitados == limite_nodos:
+                optimo = False
+                break
+            if limite is not None and time.perf_counter() > limite:
+                optimo = False
+                break
+
+            if not libres:
+                mejor = list(cliques)
+                if len(mejor) == cota:
+                    break
+                # Las demás opciones de este nodo no pueden usar menos cliques
+                marco[2] = len(opciones) + 1
+                continue
+
+            if _cota_nodo(filas, cliques, libres) >= len(mejor):
+                continue
+
+            w, opciones_w = _elegir_nodo(filas, cliques, libres)
+            pila.append([w, opciones_w, 0, -1, False])
+
+    if estadisticas is not None:
+        estadisticas["nodos_visitados"] = estadisticas.get("nodos_visitados", 0) + visitados
+
+    return [_nodos(miembros) for miembros in mejor], optimo
+
+
+def _nodos(mascara):
+    nodos = []
+    while mascara:
+        bajo = mascara & -mascara
+        nodos.append(bajo.bit_length() - 1)
+        mascara ^= bajo
+    return nodos
@@ -0,0 +1,137 @@
+from array import array
+
+import instrumentacion
+from vecinos import vecinos_compatibles
+
+
+class GrafoCSR:
+    """
+    Grafo no dirigido guardado en formato CSR con arreglos int32.
+
+    Los nodos son los índices 0..n-1 en el orden de entrada y `ids[i]` es el
+    id de la célula del nodo i; los ids van en un arreglo int64, o en una
+    lista si alguno no cabe en 64 bits. Los vecinos del nodo i ocupan
+    `adyacentes[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, ids, offsets, adyacentes):
+        self.ids = ids
+        self.offsets = offsets
+        self.adyacentes = adyacentes
+        self._filas = None
+
+    @classmethod
+    def desde_listas(cls, ids, listas):
+        """
+        Construye el grafo a partir de la lista de vecinos (por índice) de cada nodo.
+        """
+        offsets = array("i", [0])
+        adyacentes = array("i")
+        for vecinos in listas:
+            adyacentes.extend(vecinos)
+            offsets.append(len(adyacentes))
+        ids = list(ids)
+        try:
+            ids = array("q", ids)
+        except OverflowError:
+            pass
+        return cls(ids, offsets, adyacentes)
+
+    def compartir(self):
+        """
+        Copia los tres arreglos, seguidos, a un bloque de memoria compartida
+        para que otros procesos lean el grafo sin recibirlo serializado.
+
+        Devuelve (bloque, descripcion); con `descripcion` otro proceso abre el
+        grafo con desde_compartido. Quien crea el bloque debe cerrarlo y
+        liberarlo (close y unlink). Lanza OverflowError si algún id no cabe
+        en 64 bits.
+        """
+        from multiprocessing import shared_memory
+
+        datos = self.a_bytes()
+        bloque = shared_memory.SharedMemory(create=True, size=max(1, len(datos)))
+        bloque.buf[:len(datos)] = datos
+        return bloque, (bloque.name, self.tamaños())
+
+    def tamaños(self):
+        return len(self.ids), len(self.offsets), len(self.adyacentes)
+
+    def a_bytes(self):
+        """
+        Los tres arreglos seguidos, como los lee desde_compartido: los ids en
+        int64 y después offsets y adyacentes en int32.
+        """
+        return (array("q", self.ids).tobytes() + array("i", self.offsets).tobytes()
+                + array("i", self.adyacentes).tobytes())
+
+    @classmethod
+    def desde_compartido(cls, vista, tamaños):
+        """
+        Grafo de solo lectura sobre `vista`, un memoryview de bytes con los
+        arreglos en el formato de a_bytes (un bloque creado por compartir() o
+        un archivo de cache_grafos). Los arreglos no se copian.
+        """
+        n_ids, n_offsets, n_adyacentes = tamaños
+        fin_ids = 8 * n_ids
+        fin_offsets = fin_ids + 4 * n_offsets
+        return cls(vista[:fin_ids].cast("q"), vista[fin_ids:fin_offsets].cast("i"),
+                   vista[fin_offsets:fin_offsets + 4 * n_adyacentes].cast("i"))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def num_aristas(self):
+        return len(self.adyacentes) // 2
+
+    def vecinos(self, i):
+        return self.adyacentes[self.offsets[i]:self.offsets[i + 1]]
+
+    def grado(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def filas_bits(self, nodos=None):
+        """
+        Devuelve, para cada nodo, un entero cuyo bit j indica si j es vecino.
+
+        Con `nodos` se obtiene la vista del subgrafo inducido: la fila k
+        corresponde a nodos[k] y los bits usan esas mismas posiciones locales.
+        La vista del grafo completo se guarda la primera vez que se pide.
+        """
+        if nodos is None:
+            if self._filas is None:
+                self._filas = self._filas_bits(range(len(self.ids)), None)
+            return self._filas
+        return self._filas_bits(nodos, {v: k for k, v in enumerate(nodos)})
+
+    def _filas_bits(self, nodos, posicion):
+        adyacentes, offsets = self.adyacentes, self.offsets
+        filas = []
+        for i in nodos:
+            fila = 0
+            for j in adyacentes[offsets[i]:offsets[i + 1]]:
+                if posicion is None:
+                    fila |= 1 << j
+                else:
+                    k = posicion.get(j)
+                    if k is not None:
+                        fila |= 1 << k
+            filas.append(fila)
+        return filas
+
+    def son_vecinos(self, i, j):
+        return self.filas_bits()[i] >> j & 1 == 1
+
+
+def construir_grafo(celulas, d):
+    """
+    Construye el grafo de células: hay arista entre dos células si están a
+    distancia a lo sumo `d` y comparten al menos un péptido.
+
+    Cada célula es una tupla (id, x, y, peptidos).
+    """
+    coords = [(x, y) for _, x, y, _ in celulas]
+    neighbors = vecinos_compatibles(coords, [peptidos for _, _, _, peptidos in celulas], d)
+    ids = [celula[0] for celula in celulas]
+    with instrumentacion.fase("grafo"):
+        return GrafoCSR.desde_listas(ids, (neighbors[i] for i in range(len(celulas))))
@@ -1,64 +1,6 @@
-import math
-from collections import defaultdict
-def grid_neighbors(coords, d):
-    """
-    Función optimizada para encontrar vecinos dentro de una distancia `d` usando una estructura de cuadrícula.
-    """
-    grid = defaultdict(list)
-    cell_size = d  # Tamaño de la celda en función de la distancia d
-
-    # Asigna cada coordenada a una celda en la cuadrícula
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-        grid[(cell_x, cell_y)].append(i)
-
-    neighbors = defaultdict(list)
-
-    # Para cada célula, buscar vecinos en celdas adyacentes
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-
-        # Recorrer solo las celdas adyacentes y la propia celda
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                neighbor_cell = (cell_x + dx, cell_y + dy)
-
-                # Verifica cada punto en la celda vecina
-                for j in grid.get(neighbor_cell, []):
-                    if i != j:
-                        # Verifica la distancia real entre puntos para confirmar que está en el rango
-                        dist = math.sqrt((coords[i][0] - coords[j][0]) ** 2 + (coords[i][1] - coords[j][1]) ** 2)
-                        if dist <= d:
-                            neighbors[i].append(j)
-    
-    return neighbors
-
-import math
-import random
-from collections import defaultdict
-
-def construir_grafo(celulas, d):
-    """
-    Construye un grafo en el que las células son nodos y hay una arista entre dos células
-    si están dentro de una distancia `d` y tienen al menos un péptido en común.
-    """
-    grafo = defaultdict(list)
-    n = len(celulas)
-    
-    # Extraemos las coordenadas de las células para pasarlas a la función grid_neighbors
-    coords = [(x, y) for _, x, y, _ in celulas]
-
-    # Usamos la función grid_neighbors para encontrar los vecinos de las células
-    neighbors = grid_neighbors(coords, d)
-    
-    for i in range(n):
-        id1, _, _, peptidos1 = celulas[i]
-        for j in neighbors[i]:
-            id2, _, _, peptidos2 = celulas[j]
-            if peptidos1 & peptidos2:  # Si tienen péptidos en común
-                grafo[id1].append(id2)
-
-    return grafo
+import argparse
+from grafo import construir_grafo
+import instrumentacion
 
 def greedy_clique_cover(grafo):
     """
@@ -66,7 +8,8 @@ def greedy_clique_cover(grafo):
     """
     # Inicializamos los cliques
     cliques = []
-    unassigned = set(grafo.keys())  # Conjunto de células no asignadas a ningún clique
+    filas = grafo.filas_bits()
+    unassigned = set(range(len(grafo)))  # Conjunto de células no asignadas a ningún clique
 
     while unassigned:
         # Elegimos un nodo arbitrario de las células no asignadas
@@ -78,10 +21,10 @@ def greedy_clique_cover(grafo):
 
         # Buscamos los vecinos de v que pueden ser parte del mismo clique
         for u in list(new_clique):
-            for neighbor in grafo[u]:
+            for neighbor in grafo.vecinos(u):
                 if neighbor not in to_remove:
                     # Si el vecino puede unirse al clique, lo agregamos
-                    if all(neighbor in grafo[n] for n in new_clique):
+                    if all(filas[n] >> neighbor & 1 for n in new_clique):
                         new_clique.add(neighbor)
                         to_remove.add(neighbor)
 
@@ -109,17 +52,23 @@ def resolver_caso(caso):
     grafo = construir_grafo(celulas, d)
 
     # Aplicamos el algoritmo greedy para encontrar el clique cover
-    cliques = greedy_clique_cover(grafo)
+    with instrumentacion.fase("cobertura"):
+        cliques = greedy_clique_cover(grafo)
+    instrumentacion.contar("cliques", len(cliques))
 
     # Asignamos un número de clique a cada célula
     resultado = {}
     for i, clique in enumerate(cliques, start=1):
         for celula in clique:
-            resultado[celula] = i
+            resultado[grafo.ids[celula]] = i
 
     return resultado
 
 def main():
+    parser = argparse.ArgumentParser()
+    instrumentacion.agregar_opcion(parser)
+    instrumentacion.activar(parser.parse_args().instrumentar)
+
     # Casos de prueba proporcionados
     casos = [
         {
@@ -152,6 +101,7 @@ def main():
 
     for i, caso in enumerate(casos, start=1):
         resultado = resolver_caso(caso)
+        instrumentacion.emitir(caso=i, n=caso["n"], d=caso["d"])
         print(f"Caso {i}:")
         for id_celula in sorted(resultado):
             print(id_celula, resultado[id_celula])
@@ -1,67 +1,33 @@
-import math
-from collections import defaultdict
-
-def grid_neighbors(coords, d):
-    """
-    Función optimizada para encontrar vecinos dentro de una distancia `d` usando una estructura de cuadrícula.
-    """
-    grid = defaultdict(list)
-    cell_size = d  # Tamaño de la celda en función de la distancia d
-
-    # Asigna cada coordenada a una celda en la cuadrícula
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-        grid[(cell_x, cell_y)].append(i)
-
-    neighbors = defaultdict(list)
-
-    # Para cada célula, buscar vecinos en celdas adyacentes
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-
-        # Recorrer solo las celdas adyacentes y la propia celda
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                neighbor_cell = (cell_x + dx, cell_y + dy)
-
-                # Verifica cada punto en la celda vecina
-                for j in grid.get(neighbor_cell, []):
-                    if i != j:
-                        # Verifica la distancia real entre puntos para confirmar que está en el rango
-                        dist = math.sqrt((coords[i][0] - coords[j][0]) ** 2 + (coords[i][1] - coords[j][1]) ** 2)
-                        if dist <= d:
-                            neighbors[i].append(j)
-    
-    return neighbors
-def construir_grafo(celulas, d):
-    grafo = defaultdict(list)
-    n = len(celulas)
-    
-    # Extraemos las coordenadas de las células para pasarlas a la función grid_neighbors
-    coords = [(x, y) for _, x, y, _ in celulas]
-
-    # Usamos la función grid_neighbors para encontrar los vecinos de las células
-    neighbors = grid_neighbors(coords, d)
-    
-    for i in range(n):
-        id1, _, _, peptidos1 = celulas[i]
-        grafo[id1]=[]
-        for j in neighbors[i]:
-            id2, _, _, peptidos2 = celulas[j]
-            if peptidos1 & peptidos2:  # Si tienen péptidos en común
-                grafo[id1].append(id2)
-
-    return grafo
+import time
+from grafo import construir_grafo
+from peptidos import popcount
+from cobertura_exacta import clique_cover_exacto
+from busqueda_local import mejorar_cobertura
+import instrumentacion
+import resolutor
+
+# Las componentes con a lo sumo EXACTO_MAX_NODOS nodos se resuelven con el
+# método exacto, que visita a lo sumo EXACTO_NODOS nodos de búsqueda por
+# componente; las demás usan minimum_clique_cover. El presupuesto en nodos
+# hace que la salida no dependa de la carga de la máquina; EXACTO_SEGUNDOS
+# (None por defecto) agrega además un límite de tiempo por componente.
+EXACTO_MAX_NODOS = 100
+EXACTO_NODOS = 1000
+EXACTO_SEGUNDOS = None
 
 def greedy_componentes_clique(grafo):
     """
-    Asigna greedy las células a cliques minimizando el número de cliques necesarios.
+    Colorea greedy el grafo: vecinos reciben números distintos.
+
+    No es una partición en cliques (dos células del mismo número nunca son
+    vecinas); validador.py la rechaza.
     """
     cliques = {}
+    ids = grafo.ids
     
-    for celula in sorted(grafo.keys()):
+    for celula in sorted(range(len(grafo)), key=ids.__getitem__):
         # Encuentra los cliques vecinos ya asignados
-        cliques_vecinos = {cliques[vecino] for vecino in grafo[celula] if vecino in cliques}
+        cliques_vecinos = {cliques[vecino] for vecino in grafo.vecinos(celula) if vecino in cliques}
         
         # Asigna el menor número de clique disponible
         clique_asignado = 1
@@ -69,7 +35,7 @@ def greedy_componentes_clique(grafo):
             clique_asignado += 1
         cliques[celula] = clique_asignado
     
-    return cliques
+    return {ids[celula]: clique for celula, clique in cliques.items()}
 
 def resolver_caso(caso):
     """
@@ -90,36 +56,57 @@ def resolver_caso(caso):
 
     return resultado
 
-def encontrar_clique(grafo, disponibles):
+def encontrar_clique(filas, disponibles):
     """
     Encuentra un clique máximo posible usando una aproximación greedy.
+
+    `disponibles` es la máscara de nodos que pueden entrar. El clique empieza
+    en el nodo con menos vecinos disponibles, el más difícil de cubrir después.
+    Los candidatos se mantienen como la intersección de las filas de los nodos
+    ya elegidos y en cada paso entra el candidato con más vecinos entre los
+    candidatos restantes (en empate, el de menor índice).
     """
     clique = []
-    while disponibles:
+    candidatos = disponibles
+    while candidatos:
+        # En la semilla se busca el menor grado: se compara con el signo cambiado
+        signo = 1 if clique else -1
+        mejor = -1
+        mejor_clave = None
+        pendientes = candidatos
+        while pendientes:
+            bajo = pendientes & -pendientes
+            u = bajo.bit_length() - 1
+            pendientes ^= bajo
+            clave = signo * popcount(filas[u] & candidatos)
+            if mejor_clave is None or clave > mejor_clave:
+                mejor, mejor_clave = u, clave
+
+        clique.append(mejor)
+        candidatos &= filas[mejor]
 
-        v = disponibles.pop()
-        clique.append(v)
-        disponibles = {u for u in disponibles if all(u in grafo[n] for n in clique)}
-    
     return clique
 
 
-def minimum_clique_cover(grafo):
+def minimum_clique_cover(grafo, nodos=None):
     """
     Encuentra una aproximación greedy para el Minimum Clique Cover.
+
+    Con `nodos` se cubre solo el subgrafo inducido por esos nodos.
     """
-    cubiertos = set()
-    nodos = set(grafo.keys())
-    cliques = []
+    if nodos is None:
+        nodos = range(len(grafo))
+    nodos = list(nodos)
+    filas = grafo.filas_bits(nodos)
 
-    while nodos != cubiertos:
-        disponibles = nodos - cubiertos
-    
-        clique = encontrar_clique(grafo, disponibles.copy())
-        cliques.append(clique)
+    libres = (1 << len(nodos)) - 1
+    cliques = []
 
-      
-        cubiertos.update(clique)
+    while libres:
+        clique = encontrar_clique(filas, libres)
+        cliques.append([nodos[k] for k in clique])
+        for k in clique:
+            libres &= ~(1 << k)
 
     return cliques
 
@@ -128,69 +115,133 @@ def componentes_conexas(grafo):
     """
     Encuentra las componentes conexas del grafo usando DFS iterativo.
     """
-    visitados = set()
+    visitados = bytearray(len(grafo))
     componentes = []
 
-    for nodo in grafo:
-        if nodo not in visitados:
+    for nodo in range(len(grafo)):
+        if not visitados[nodo]:
             componente = []
         
             pila = [nodo]
             while pila:
                 actual = pila.pop()
-                if actual not in visitados:
-                    visitados.add(actual)
+                if not visitados[actual]:
+                    visitados[actual] = 1
                     componente.append(actual)
                  
-                    for vecino in grafo[actual]:
-                        if vecino not in visitados:
+                    for vecino in grafo.vecinos(actual):
+                        if not visitados[vecino]:
                             pila.append(vecino)
             componentes.append(componente)
 
     return componentes
 
-# Integrar todo en el flujo principal
-def resolver_caso(n, d, celulas):
-    celulas = [(int(data[0]), int(data[1]), int(data[2]), set(data[3:])) for data in celulas]
-    grafo = construir_grafo(celulas, d)
-    componentes = componentes_conexas(grafo)
+def cubrir_componente(grafo, componente, plazo=None):
+    """
+    Cubre una componente conexa eligiendo el método según su tamaño.
+
+    Devuelve (cliques, optimo). Con `plazo` el método exacto no pasa de ese
+    instante (segundos de time.time()).
+    """
+    k = len(componente)
+
+    # Nodos aislados y componentes completas ya son un clique
+    if k == 1 or all(grafo.grado(nodo) == k - 1 for nodo in componente):
+        return [componente], True
+
+    segundos = EXACTO_SEGUNDOS
+    if plazo is not None:
+        restante = max(0.0, plazo - time.time())
+        segundos = restante if segundos is None else min(segundos, restante)
+
+    if k <= EXACTO_MAX_NODOS and (segundos is None or segundos > 0):
+        filas = grafo.filas_bits(componente)
+        estadisticas = {} if instrumentacion.ACTIVA else None
+        cliques, optimo = clique_cover_exacto(filas, segundos, estadisticas, EXACTO_NODOS)
+        if estadisticas is not None:
+            instrumentacion.contar("nodos_visitados", estadisticas["nodos_visitados"])
+        cliques = [[componente[v] for v in clique] for clique in cliques]
+        if optimo:
+            return cliques, True
+
+        # Se acabó el tiempo: quedarse con la mejor de las dos aproximaciones
+        greedy = minimum_clique_cover(grafo, componente)
+        return (greedy if len(greedy) < len(cliques) else cliques), False
+
+    return minimum_clique_cover(grafo, componente), False
+
+
+def mejorar_componente(grafo, componente, cliques, plazo):
+    """
+    Sigue mejorando con búsqueda local la cobertura de una componente hasta `plazo`.
+    """
+    posicion = {nodo: k for k, nodo in enumerate(componente)}
+    locales = [[posicion[nodo] for nodo in clique] for clique in cliques]
+    locales = mejorar_cobertura(grafo.filas_bits(componente), locales, plazo)
+    return [[componente[k] for k in clique] for clique in locales]
+
+def cubrir_grafo(grafo, plazo=None):
+    """
+    Cubre el grafo componente por componente y devuelve el número de clique de
+    cada célula, por id.
+    """
+    with instrumentacion.fase("cobertura"):
+        componentes = componentes_conexas(grafo)
+        coberturas = [cubrir_componente(grafo, componente, plazo) for componente in componentes]
+
+    # Con plazo, el tiempo que sobra se reparte entre las componentes que no
+    # quedaron probadas como óptimas
+    if plazo is not None:
+        pendientes = [k for k, (_, optimo) in enumerate(coberturas) if not optimo]
+        for restantes, k in zip(range(len(pendientes), 0, -1), pendientes):
+            ahora = time.time()
+            if ahora >= plazo:
+                break
+            limite = ahora + (plazo - ahora) / restantes
+            with instrumentacion.fase("busqueda_local"):
+                cliques = mejorar_componente(grafo, componentes[k], coberturas[k][0], limite)
+            coberturas[k] = (cliques, False)
+
     resultado = {}
     clique_id = 1
 
-    for componente in componentes:
-        subgrafo = {nodo: [vec for vec in grafo[nodo] if vec in componente] for nodo in componente}
-        cliques = minimum_clique_cover(subgrafo)
-
+    for cliques, _ in coberturas:
         for clique in cliques:
             for nodo in clique:
-                resultado[nodo] = clique_id
+                resultado[grafo.ids[nodo]] = clique_id
             clique_id += 1
+    instrumentacion.contar("cliques", clique_id - 1)
     return resultado
 
+# Integrar todo en el flujo principal
+def resolver_caso(n, d, celulas, plazo=None):
+    celulas = [(int(data[0]), int(data[1]), int(data[2]), set(data[3:])) for data in celulas]
+    grafo = construir_grafo(celulas, d)
+    return cubrir_grafo(grafo, plazo)
+
+
+def configurar(exacto_max_nodos, exacto_nodos, exacto_segundos):
+    """
+    Fija las opciones del método exacto en el proceso que resuelve los casos.
+    """
+    global EXACTO_MAX_NODOS, EXACTO_NODOS, EXACTO_SEGUNDOS
+    EXACTO_MAX_NODOS = exacto_max_nodos
+    EXACTO_NODOS = exacto_nodos
+    EXACTO_SEGUNDOS = exacto_segundos
+
 
 def main():
-    import sys
-    input = sys.stdin.read
-    data = input().splitlines()
-    
-    t = int(data[0])  # Número de casos
-    index = 1
-    resultados = []
-    
-    for _ in range(t):
-        n, d = map(int, data[index].split())
-        index += 1
-        celulas = [data[index + i].split() for i in range(n)]
-        index += n
-        
-        # Resolver cada caso
-        resultado = resolver_caso(n, d, celulas)
-        resultados.append(resultado)
-    
-    # Imprimir resultados
-    for resultado in resultados:
-        for id_celula in sorted(resultado):
-            print(id_celula, resultado[id_celula])
+    parser = resolutor.crear_parser(plazos=True)
+    parser.add_argument("--exacto-max-nodos", type=int, default=EXACTO_MAX_NODOS,
+                        help="tamaño máximo de componente que se resuelve de forma exacta (0 = nunca)")
+    parser.add_argument("--exacto-nodos", type=int, default=EXACTO_NODOS,
+                        help="nodos de búsqueda que puede visitar el método exacto por componente")
+    parser.add_argument("--exacto-segundos", type=float, default=EXACTO_SEGUNDOS,
+                        help="tiempo máximo del método exacto por componente (por defecto sin límite de tiempo; "
+                             "la salida pasa a depender de la velocidad de la máquina)")
+    args = parser.parse_args()
+    resolutor.ejecutar(args, cubrir_grafo, inicializar=configurar,
+                       argumentos=(args.exacto_max_nodos, args.exacto_nodos, args.exacto_segundos))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,91 @@
+import sys
+import time
+
+# Si es False, fase() y contar() no hacen nada y las ejecuciones normales no
+# pagan por las medidas. Los scripts la activan con la opción --instrumentar.
+ACTIVA = False
+
+_tiempos = {}
+_contadores = {}
+
+
+class _Fase:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        _tiempos[self.nombre] = _tiempos.get(self.nombre, 0.0) + time.perf_counter() - self.inicio
+        return False
+
+
+class _FaseVacia:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+_VACIA = _FaseVacia()
+
+
+def agregar_opcion(parser):
+    """
+    Agrega a `parser` la opción --instrumentar que usan todos los scripts.
+    """
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="escribir en stderr una línea JSON por caso con los tiempos de cada fase y los contadores")
+
+
+def activar(activa=True):
+    """
+    Enciende o apaga la instrumentación en este proceso.
+    """
+    global ACTIVA
+    ACTIVA = activa
+    _tiempos.clear()
+    _contadores.clear()
+
+
+def fase(nombre):
+    """
+    Context manager que suma el tiempo del bloque a la fase `nombre`.
+    Con la instrumentación apagada devuelve siempre el mismo objeto vacío.
+    """
+    if not ACTIVA:
+        return _VACIA
+    return _Fase(nombre)
+
+
+def contar(nombre, cantidad=1):
+    """
+    Suma `cantidad` al contador `nombre`.
+    """
+    if ACTIVA:
+        _contadores[nombre] = _contadores.get(nombre, 0) + cantidad
+
+
+def emitir(**datos):
+    """
+    Escribe en stderr una línea JSON con `datos` y las fases y contadores
+    acumulados desde la emisión anterior, y los reinicia.
+    """
+    if not ACTIVA:
+        return
+    import json
+
+    registro = dict(datos)
+    registro["fases"] = {nombre: round(segundos, 6) for nombre, segundos in _tiempos.items()}
+    registro["contadores"] = dict(_contadores)
+    sys.stderr.write(json.dumps(registro) + "\n")
+    sys.stderr.flush()
+    _tiempos.clear()
+    _contadores.clear()
@@ -0,0 +1,78 @@
+from array import array
+
+import instrumentacion
+
+
+def _lineas_no_vacias(flujo):
+    for linea in flujo:
+        if linea.strip():
+            yield linea
+
+
+def leer_casos_texto(flujo):
+    """
+    Lee los casos de un flujo binario con buffer (por ejemplo sys.stdin.buffer)
+    uno por uno, sin cargar el archivo completo.
+
+    Produce el texto crudo (bytes) de cada caso: la línea `n d` seguida de sus
+    n líneas de células.
+    """
+    lineas = _lineas_no_vacias(flujo)
+    t = int(next(lineas))  # Número de casos
+
+    for _ in range(t):
+        cabecera = next(lineas)
+        n = int(cabecera.split()[0])
+        yield cabecera + b"".join(next(lineas) for _ in range(n))
+
+
+def parsear_caso(texto):
+    """
+    Convierte el texto crudo de un caso en (n, d, filas), donde cada fila es la
+    lista de campos de una célula.
+    """
+    with instrumentacion.fase("parseo"):
+        lineas = texto.decode().splitlines()
+        n, d = map(int, lineas[0].split())
+        filas = [linea.split() for linea in lineas[1:n + 1]]
+    return n, d, filas
+
+
+def parsear_columnas(texto, campos):
+    """
+    Convierte el texto crudo de un caso en columnas, en una sola pasada.
+
+    Devuelve (n, d, columnas, offsets, peptidos): `columnas` son los `campos`
+    primeros números de cada célula como arreglos int64, o listas si algún
+    número no cabe en 64 bits (por ejemplo id, x, y y tipo), y los péptidos
+    de la célula i, sin decodificar, son `peptidos[offsets[i]:offsets[i + 1]]`.
+    """
+    with instrumentacion.fase("parseo"):
+        lineas = texto.split(b"\n")
+        n, d = map(int, lineas[0].split())
+
+        numeros = []
+        peptidos = []
+        offsets = array("i", [0])
+        for linea in lineas[1:n + 1]:
+            partes = linea.split()
+            numeros.extend(partes[:campos])
+            peptidos.extend(partes[campos:])
+            offsets.append(len(peptidos))
+
+        numeros = list(map(int, numeros))
+        try:
+            numeros = array("q", numeros)
+        except OverflowError:
+            pass
+        columnas = [numeros[k::campos] for k in range(campos)]
+    return n, d, columnas, offsets, peptidos
+
+
+def formatear_resultado(resultado):
+    """
+    Devuelve las líneas `id clique` de un caso ordenadas por id.
+    """
+    with instrumentacion.fase("salida"):
+        return "".join(f"{id_celula} {resultado[id_celula]}\n" for id_celula in sorted(resultado))
+
@@ -1,115 +1,58 @@
-import sys
-from collections import defaultdict
-import math
-
-def grid_neighbors(coords, d):
-    grid = defaultdict(list)
-    cell_size = d
-
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-        grid[(cell_x, cell_y)].append(i)
-
-    neighbors = defaultdict(list)
-
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                neighbor_cell = (cell_x + dx, cell_y + dy)
-                for j in grid.get(neighbor_cell, []):
-                    if i != j:
-                        dist = math.sqrt((coords[i][0] - coords[j][0]) ** 2 + (coords[i][1] - coords[j][1]) ** 2)
-                        if dist <= d:
-                            neighbors[i].append(j)
-
-    return neighbors
-
-def construir_grafo(celulas, d):
-    grafo = defaultdict(list)
-    n = len(celulas)
-
-    coords = [(x, y) for _, x, y, _ in celulas]
-    neighbors = grid_neighbors(coords, d)
-
-    for i in range(n):
-        id1, _, _, peptidos1 = celulas[i]
-        grafo[id1]=[]
-        for j in neighbors[i]:
-            id2, _, _, peptidos2 = celulas[j]
-            if peptidos1 & peptidos2:
-                grafo[id1].append(id2)
-
-    return grafo
+from grafo import construir_grafo
+import instrumentacion
+import resolutor
 
 def clique_aproximation(grafo):
-    processed_nodes = set()
+    processed_nodes = bytearray(len(grafo))
     groups = []
-    adjacency_list = {node: set(neighbors) for node, neighbors in grafo.items()}
+    posicion = {id_celula: nodo for nodo, id_celula in enumerate(grafo.ids)}
+
+    for current_node in range(len(grafo)):
+        if not processed_nodes[current_node]:
+            group = [current_node]
+            processed_nodes[current_node] = 1
 
-    for current_node in adjacency_list:
-        if current_node not in processed_nodes:
-            group = {current_node}
-            processed_nodes.add(current_node)
+            # Cuántos miembros del grupo tiene cada nodo como vecinos
+            conexiones = dict.fromkeys(grafo.vecinos(current_node), 1)
 
-            # Lista de vecinos ordenados por el número de conexiones con el grupo
-            potential_members = sorted(
-                adjacency_list[current_node], 
-                key=lambda neighbor: len(adjacency_list[neighbor].intersection(group)), 
-                reverse=True
-            )
+            # Todos los vecinos tienen la misma conexión con el grupo inicial,
+            # así que se recorren en el orden de un set de sus ids, el mismo
+            # desempate que cuando la adyacencia se guardaba en sets
+            potential_members = [posicion[id_celula]
+                                 for id_celula in {grafo.ids[v] for v in grafo.vecinos(current_node)}]
             
             # Expandir el grupo de manera codiciosa
             for neighbor in potential_members:
-                if neighbor not in processed_nodes:
+                if not processed_nodes[neighbor]:
                     # Verificar si el vecino se conecta con todos los miembros del grupo
-                    if group.issubset(adjacency_list[neighbor]):
-                        group.add(neighbor)
-                        processed_nodes.add(neighbor)
+                    if conexiones[neighbor] == len(group):
+                        group.append(neighbor)
+                        processed_nodes[neighbor] = 1
+                        for vecino in grafo.vecinos(neighbor):
+                            if vecino in conexiones:
+                                conexiones[vecino] += 1
 
             groups.append(group)
 
     # Asignar un grupo único a cada nodo
     return {
-        node: group_index + 1
+        grafo.ids[node]: group_index + 1
         for group_index, group in enumerate(groups)
         for node in group
     }
 
 
 def resolver_caso(n, d, celulas):
-    grafo = construir_grafo(celulas, d)
-    resultado = clique_aproximation(grafo)
+    return resolver_grafo(construir_grafo(celulas, d))
+
+def resolver_grafo(grafo):
+    with instrumentacion.fase("cobertura"):
+        resultado = clique_aproximation(grafo)
+    instrumentacion.contar("cliques", len(set(resultado.values())))
     return resultado
 
 def main():
-    input = sys.stdin.read
-    data = input().strip().split("\n")
-    
-    t = int(data[0])  # Número de casos de prueba
-    index = 1
-    results = []
-    
-    for _ in range(t):
-        n, d = map(int, data[index].split())
-        index += 1
-        celulas = []
-        
-        for _ in range(n):
-            line = data[index].split()
-            index += 1
-            id_celula = int(line[0])
-            x, y = map(int, line[1:3])
-            peptidos = set(line[3:])
-            celulas.append((id_celula, x, y, peptidos))
-        
-        resultado = resolver_caso(n, d, celulas)
-        
-        for id_celula in sorted(resultado):
-            results.append(f"{id_celula} {resultado[id_celula]}")
-    
-    sys.stdout.write("\n".join(results) + "\n")
+    resolutor.main(resolver_grafo)
 
 if __name__ == "__main__":
     main()
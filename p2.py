@@ -1,195 +1,709 @@
-from collections import defaultdict, deque
-import numpy as np
+from array import array
+from collections import deque
 import time
 import math
+import argparse
+import sys
+import vecinos
+from vecinos import vecinos_compatibles
+from peptidos import internar_peptidos, popcount
+from lector import leer_casos_texto, parsear_columnas
+import paralelo
+import instrumentacion
+
+# How to evaluate each blocked calculator: "incremental" reuses the max flow
+# of the full network, "full" recomputes it from scratch.
+BLOCKING = "incremental"
+BLOCKING_MODES = ("incremental", "full")
+
+# Which calculators to try: "percentile" only those in the top 20% of
+# flow_per_node, "exact" all of them, pruned with throughput bounds.
+SEARCH = "percentile"
+SEARCH_MODES = ("percentile", "exact")
+
+# Max-flow algorithm for the blocked networks: a name in MAX_FLOW_BACKENDS,
+# or "auto" to choose by edge density (edges per node at or above
+# AUTO_DENSITY use push-relabel)
+ALGORITHM = "dinic"
+ALGORITHMS = ("dinic", "push-relabel", "auto")
+AUTO_DENSITY = 16
+
+# Processes that evaluate the blocked calculators of a case (0 = all cores)
+BLOCKING_JOBS = 1
+
+# Whether each result carries the per-edge flows and path decomposition
+FLOW_REPORT = False
+
+# Network of the current case inside each blocking worker
+_worker = None
+
+def _init_blocking_worker(snapshot, source, sink, blocking, algorithm):
+    global _worker, BLOCKING, ALGORITHM
+    _worker = (Graph.from_snapshot(snapshot), source, sink)
+    BLOCKING = blocking
+    ALGORITHM = algorithm
+
+def _blocked_flow(node):
+    graph, source, sink = _worker
+    if BLOCKING == "incremental":
+        return graph.blocked_flow(source, sink, node)
+    return graph.max_flow(source, sink, blocked=node)
+
 class Graph:
-    def __init__(self):
-        self.graph = defaultdict(list)
-        self.capacity = defaultdict(int)
-        self.flow_per_node = defaultdict(int)
-        self.level = {}
-        self.ptr = {}
+    # Nodes are the integers 0..num_nodes-1. Edge e and its residual twin e ^ 1
+    # sit next to each other in the flat arrays `to` and `capacity`; a pair
+    # u, v gets a single twin pair no matter how many times it is added, so
+    # capacities added in both directions share the same residual edges.
+    def __init__(self, num_nodes):
+        self.num_nodes = num_nodes
+        self.to = array("i")
+        self.capacity = array("q")
+        self.flow_per_node = [0] * num_nodes
+        self.pair_edge = {}
+        self.adjacency = [[] for _ in range(num_nodes)]
+        self.offsets = None
+        self.edges = None
 
     def add_edge(self, u, v, cap):
-        self.graph[u].append(v)
-        self.graph[v].append(u)
-        self.capacity[(u, v)] += cap
-        self.capacity[(v, u)] += 0
-
-    def bfs(self, source, sink, blocked):
-        self.level = {source: 0}
-        queue = deque([source])
+        e = self.pair_edge.get((u, v))
+        if e is None:
+            e = len(self.to)
+            self.to.append(v)
+            self.to.append(u)
+            self.capacity.append(0)
+            self.capacity.append(0)
+            self.pair_edge[(u, v)] = e
+            self.pair_edge[(v, u)] = e ^ 1
+            self.adjacency[u].append(e)
+            self.adjacency[v].append(e ^ 1)
+            self.offsets = None
+        self.capacity[e] += cap
+
+    def build(self):
+        # Adjacency as CSR: the edges leaving u are edges[offsets[u]:offsets[u + 1]]
+        self.offsets = array("i", [0])
+        self.edges = array("i")
+        for out_edges in self.adjacency:
+            self.edges.extend(out_edges)
+            self.offsets.append(len(self.edges))
+        # Scratch levels, always back to -1 between searches
+        self.level = [-1] * self.num_nodes
+
+    def bfs(self, supply, demand, blocked, capacity, labeled):
+        # Levels from every node with supply left; stops at the first node with demand
+        level = self.level
+        to, edges, offsets = self.to, self.edges, self.offsets
+        queue = deque()
+        for u in supply:
+            level[u] = 0
+            labeled.append(u)
+            queue.append(u)
 
         while queue:
             u = queue.popleft()
-            for v in self.graph[u]:
-                if v not in self.level and self.capacity[(u, v)] > 0 and u != blocked and v != blocked:
-                    self.level[v] = self.level[u] + 1
+            next_level = level[u] + 1
+            for k in range(offsets[u], offsets[u + 1]):
+                e = edges[k]
+                v = to[e]
+                if level[v] < 0 and capacity[e] > 0 and v != blocked:
+                    level[v] = next_level
+                    labeled.append(v)
                     queue.append(v)
-                    if v == sink:
+                    if v in demand:
                         return True
         return False
 
-    def dfs(self, u, sink, flow, blocked, original_caps):
-        if u == sink:
-            return flow
-        while self.ptr[u] < len(self.graph[u]):
-            v = self.graph[u][self.ptr[u]]
-            if self.level.get(v, -1) == self.level[u] + 1 and self.capacity[(u, v)] > 0 and u != blocked and v != blocked:
-                cur_flow = min(flow, self.capacity[(u, v)])
-                result = self.dfs(v, sink, cur_flow, blocked, original_caps)
-                if result > 0:
-                    # Restore original capacity if blocking node is removed
-                    if (u, v) not in original_caps:
-                        original_caps[(u, v)] = self.capacity[(u, v)]
-                        original_caps[(v, u)] = self.capacity[(v, u)]
-
-                    self.capacity[(u, v)] -= result
-                    self.capacity[(v, u)] += result
-                    self.flow_per_node[u] += result
-                    self.flow_per_node[v] += result
-                    return result
-            self.ptr[u] += 1
-        return 0
-
-    def dinic(self, source, sink, blocked=None):
-        max_flow = 0
-        original_caps = {}
-
-        while self.bfs(source, sink, blocked):
-            self.ptr = {u: 0 for u in self.graph}
+    def blocking_flow(self, supply, demand, blocked, capacity, flow_per_node):
+        to, edges, offsets, level = self.to, self.edges, self.offsets, self.level
+        ptr = {}
+        total = 0
+        path = []
+
+        for start in list(supply):
+            u = start
             while True:
-                flow = self.dfs(source, sink, float('Inf'), blocked, original_caps)
-                if flow == 0:
+                if u in demand:
+                    flow = min(supply[start], demand[u], min(capacity[e] for e in path))
+                    for e in path:
+                        capacity[e] -= flow
+                        capacity[e ^ 1] += flow
+                        if flow_per_node is not None:
+                            flow_per_node[to[e ^ 1]] += flow
+                            flow_per_node[to[e]] += flow
+                    total += flow
+                    path.clear()
+                    supply[start] -= flow
+                    demand[u] -= flow
+                    if not demand[u]:
+                        del demand[u]
+                    if not supply[start]:
+                        del supply[start]
+                        break
+                    u = start
+                    continue
+
+                end = offsets[u + 1]
+                next_level = level[u] + 1
+                k = ptr.get(u, offsets[u])
+                while k < end:
+                    e = edges[k]
+                    v = to[e]
+                    if level[v] == next_level and capacity[e] > 0 and v != blocked:
+                        break
+                    k += 1
+                ptr[u] = k
+
+                if k < end:
+                    path.append(e)
+                    u = v
+                elif u == start:
                     break
-                max_flow += flow
-
-        for u, v in original_caps:
-            self.capacity[(u, v)] = original_caps[(u, v)]
+                else:
+                    # Dead end: retreat and skip the edge that led here
+                    e = path.pop()
+                    u = to[e ^ 1]
+                    ptr[u] += 1
+        return total
+
+    def route(self, supply, demand, blocked, capacity, flow_per_node=None):
+        # Dinic from several sources to several sinks: `supply` and `demand`
+        # map nodes to the amount they can still send or take, and are
+        # consumed as flow is pushed
+        if self.offsets is None:
+            self.build()
+        level = self.level
+        total = 0
+
+        while supply and demand:
+            labeled = []
+            found = self.bfs(supply, demand, blocked, capacity, labeled)
+            if found:
+                total += self.blocking_flow(supply, demand, blocked, capacity, flow_per_node)
+            for u in labeled:
+                level[u] = -1
+            if not found:
+                break
+        return total
+
+    def max_flow(self, source, sink, blocked=None, algorithm=None):
+        if self.offsets is None:
+            self.build()
+        if blocked is None:
+            blocked = -1
+        if algorithm is None:
+            algorithm = ALGORITHM
+        if algorithm == "auto":
+            algorithm = self.choose_algorithm()
+
+        # Work on a copy of the capacities so every call starts from the original network
+        capacity = self.capacity[:]
+        max_flow = MAX_FLOW_BACKENDS[algorithm](self, source, sink, blocked, capacity)
+
+        if blocked < 0:
+            # Keep the residual network of the full max flow for blocked_flow
+            self.residual = capacity
+            self.flow_value = max_flow
         return max_flow
 
-def grid_neighbors(coords, d):
-    """
-    Función optimizada para encontrar vecinos dentro de una distancia `d` usando una estructura de cuadrícula.
-    """
-    grid = defaultdict(list)
-    cell_size = d  # Tamaño de la celda en función de la distancia d
-
-    # Asigna cada coordenada a una celda en la cuadrícula
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-        grid[(cell_x, cell_y)].append(i)
-
-    neighbors = defaultdict(list)
-
-    # Para cada célula, buscar vecinos en celdas adyacentes
-    for i, (x, y) in enumerate(coords):
-        cell_x, cell_y = int(x // cell_size), int(y // cell_size)
-
-        # Recorrer solo las celdas adyacentes y la propia celda
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                neighbor_cell = (cell_x + dx, cell_y + dy)
-
-                # Verifica cada punto en la celda vecina
-                for j in grid.get(neighbor_cell, []):
-                    if i != j:
-                        # Verifica la distancia real entre puntos para confirmar que está en el rango
-                        dist = math.sqrt((coords[i][0] - coords[j][0]) ** 2 + (coords[i][1] - coords[j][1]) ** 2)
-                        if dist <= d:
-                            neighbors[i].append(j)
-    
-    return neighbors
-
-def calculate_cells(cases):
-    results = []
-    for case in cases:
-        n, d, cells = case
-        graph = Graph()
-        source = 'source'
-        sink = 'sink'
+    def choose_algorithm(self):
+        # Push-relabel pays off once nodes have many edges to push along
+        if len(self.edges) >= AUTO_DENSITY * self.num_nodes:
+            return "push-relabel"
+        return "dinic"
+
+    # Max-flow backends: each one gets the residual capacities in `capacity`,
+    # leaves a max flow in them, adds to flow_per_node and returns the flow value
+
+    def dinic(self, source, sink, blocked, capacity):
+        # No flow can exceed what leaves the source
+        limit = self.out_capacity(source)
+        return self.route({source: limit}, {sink: limit}, blocked, capacity, self.flow_per_node)
+
+    def out_capacity(self, u):
+        return sum(self.capacity[self.edges[k]] for k in range(self.offsets[u], self.offsets[u + 1]))
+
+    def push_relabel(self, source, sink, blocked, capacity):
+        # Highest-label push-relabel with global relabeling. Excess that cannot
+        # reach the sink is sent back to the source, so the result is a flow
+        n = self.num_nodes
+        to, edges, offsets = self.to, self.edges, self.offsets
+
+        original = self.capacity
+
+        excess = [0] * n
+        height = self.global_relabel(source, sink, blocked, capacity)
+        current = list(offsets)
+        for k in range(offsets[source], offsets[source + 1]):
+            e = edges[k]
+            v = to[e]
+            flow = capacity[e]
+            if v != blocked and flow > 0:
+                capacity[e] = 0
+                capacity[e ^ 1] += flow
+                excess[v] += flow
+                excess[source] -= flow
+
+        buckets = [[] for _ in range(2 * n + 1)]
+        top = 0
+        for u in range(n):
+            if excess[u] > 0 and u != sink:
+                buckets[height[u]].append(u)
+                top = max(top, height[u])
+
+        relabels = 0
+        while top >= 0:
+            if not buckets[top]:
+                top -= 1
+                continue
+            u = buckets[top].pop()
+            if excess[u] == 0 or height[u] != top:
+                continue
+
+            end = offsets[u + 1]
+            while excess[u] > 0:
+                k = current[u]
+                if k == end:
+                    # Relabel: just above the lowest neighbour still reachable
+                    lowest = 2 * n
+                    for k in range(offsets[u], end):
+                        e = edges[k]
+                        if capacity[e] > 0 and to[e] != blocked and height[to[e]] < lowest:
+                            lowest = height[to[e]]
+                    height[u] = min(lowest + 1, 2 * n)
+                    current[u] = offsets[u]
+                    relabels += 1
+                    if relabels >= n:
+                        break
+                    continue
+
+                e = edges[k]
+                v = to[e]
+                if capacity[e] > 0 and v != blocked and height[u] == height[v] + 1:
+                    flow = min(excess[u], capacity[e])
+                    capacity[e] -= flow
+                    capacity[e ^ 1] += flow
+                    excess[u] -= flow
+                    if excess[v] == 0 and v != source and v != sink:
+                        buckets[height[v]].append(v)
+                    excess[v] += flow
+                else:
+                    current[u] = k + 1
+
+            if relabels >= n:
+                # Global relabel: exact distances and fresh buckets
+                relabels = 0
+                height = self.global_relabel(source, sink, blocked, capacity)
+                current = list(offsets)
+                buckets = [[] for _ in range(2 * n + 1)]
+                top = 0
+                for w in range(n):
+                    if excess[w] > 0 and w != source and w != sink:
+                        buckets[height[w]].append(w)
+                        top = max(top, height[w])
+            elif excess[u] > 0:
+                buckets[height[u]].append(u)
+                top = max(top, height[u])
+            else:
+                top = max(top, height[u])
+
+        flow_per_node = self.flow_per_node
+        for e in range(0, len(to), 2):
+            flow = original[e] - capacity[e]
+            if flow:
+                flow_per_node[to[e]] += abs(flow)
+                flow_per_node[to[e ^ 1]] += abs(flow)
+        return excess[sink]
+
+    def global_relabel(self, source, sink, blocked, capacity):
+        # Heights from backward BFS: distance to the sink, or n plus the
+        # distance to the source for nodes that can no longer reach the sink
+        n = self.num_nodes
+        to, edges, offsets = self.to, self.edges, self.offsets
+        height = [2 * n] * n
+        height[sink] = 0
+        height[source] = n
+        for start in (sink, source):
+            queue = deque([start])
+            while queue:
+                v = queue.popleft()
+                for k in range(offsets[v], offsets[v + 1]):
+                    e = edges[k]
+                    u = to[e]
+                    # u can push to v through the twin of e
+                    if height[u] == 2 * n and u != blocked and capacity[e ^ 1] > 0:
+                        height[u] = height[v] + 1
+                        queue.append(u)
+        return height
+
+    def snapshot(self):
+        # Compact copy of the network and its max flow, sent once to each worker
+        if self.offsets is None:
+            self.build()
+        return (self.num_nodes, self.to, self.offsets, self.edges, self.capacity,
+                self.residual, self.flow_value)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        graph = cls.__new__(cls)
+        (graph.num_nodes, graph.to, graph.offsets, graph.edges, graph.capacity,
+         graph.residual, graph.flow_value) = snapshot
+        graph.flow_per_node = [0] * graph.num_nodes
+        graph.level = [-1] * graph.num_nodes
+        return graph
+
+    def throughput(self, u):
+        # Flow that goes through u in the stored max flow
+        original, residual = self.capacity, self.residual
+        total = 0
+        for k in range(self.offsets[u], self.offsets[u + 1]):
+            e = self.edges[k]
+            if original[e] > residual[e]:
+                total += original[e] - residual[e]
+        return total
+
+    def edge_flows(self):
+        # (u, v, flow) for every pair of nodes with net flow from u to v in the stored max flow
+        original, residual, to = self.capacity, self.residual, self.to
+        flows = []
+        for e in range(0, len(to), 2):
+            flow = original[e] - residual[e]
+            if flow > 0:
+                flows.append((to[e ^ 1], to[e], flow))
+            elif flow < 0:
+                flows.append((to[e], to[e ^ 1], -flow))
+        return flows
+
+    def decompose(self, source, sink):
+        # Splits the stored max flow into source-sink paths, as (flow, nodes)
+        # pairs. Cycles found on the way carry no flow to the sink and are
+        # cancelled. Every step saturates an edge or advances a pointer, so
+        # the cost is O(E * paths)
+        original, residual, to = self.capacity, self.residual, self.to
+        edges, offsets = self.edges, self.offsets
+        remaining = [max(0, original[e] - residual[e]) for e in range(len(to))]
+        ptr = list(offsets)
+        paths = []
+
+        while True:
+            path = []
+            position = {source: 0}
+            u = source
+            while u != sink:
+                k = ptr[u]
+                end = offsets[u + 1]
+                while k < end and not remaining[edges[k]]:
+                    k += 1
+                ptr[u] = k
+                if k == end:
+                    # Only the source can run out: the flow is conserved elsewhere
+                    return paths
+
+                e = edges[k]
+                v = to[e]
+                if v in position:
+                    start = position[v]
+                    cycle = path[start:] + [e]
+                    flow = min(remaining[c] for c in cycle)
+                    for c in cycle:
+                        remaining[c] -= flow
+                    for c in path[start:]:
+                        del position[to[c]]
+                    del path[start:]
+                else:
+                    path.append(e)
+                    position[v] = len(path)
+                u = v
+
+            flow = min(remaining[e] for e in path)
+            for e in path:
+                remaining[e] -= flow
+            paths.append((flow, [to[e] for e in path[:-1]]))
+
+    def blocked_flow(self, source, sink, blocked):
+        # Max flow with `blocked` removed, starting from the stored max flow:
+        # only the flow that went through the blocked node is rerouted or cancelled
+        capacity = self.residual[:]
+        original = self.capacity
+        to, edges, offsets = self.to, self.edges, self.offsets
+
+        # Drop the flow on the edges of the blocked node: the nodes that sent
+        # flow into it are left with an excess, the ones it fed with a deficit
+        excess = {}
+        deficit = {}
+        for k in range(offsets[blocked], offsets[blocked + 1]):
+            e = edges[k]
+            v = to[e]
+            flow = original[e] - capacity[e]
+            capacity[e] = original[e]
+            capacity[e ^ 1] = original[e ^ 1]
+            if flow > 0:
+                deficit[v] = flow
+            elif flow < 0:
+                excess[v] = -flow
+
+        # Reroute what can go around the blocked node, then send the rest of
+        # the excess back to the source and take the rest of the deficit from the sink
+        self.route(excess, deficit, blocked, capacity)
+        lost = sum(excess.values())
+        self.route(excess, {source: lost}, blocked, capacity)
+        self.route({sink: lost}, deficit, blocked, capacity)
+        return self.flow_value - lost
+
+def percentile(values, q):
+    # Same result as numpy.percentile with linear interpolation, including
+    # its rounding, without importing NumPy for a single call per case
+    if not values:
+        return math.nan
+    values = sorted(values)
+    index = (len(values) - 1) * (q / 100)
+    lower = math.floor(index)
+    upper = min(lower + 1, len(values) - 1)
+    t = index - lower
+    a, b = values[lower], values[upper]
+    if t >= 0.5:
+        return b - (b - a) * (1 - t)
+    return a + (b - a) * t
+
+MAX_FLOW_BACKENDS = {
+    "dinic": Graph.dinic,
+    "push-relabel": Graph.push_relabel,
+}
+
+def build_network(n, d, columns, offsets, peptide_list):
+    # Cell i is node i; the super source and sink go after the cells
+    ids, xs, ys, types = columns
+    graph = Graph(n + 2)
+    source = n
+    sink = n + 1
+
+    calculators = [i for i in range(n) if types[i] == 2]
+    coords = list(zip(xs, ys))
+
+    # Each cell's peptides are sliced once and turned into a bit mask
+    peptides = [peptide_list[offsets[i]:offsets[i + 1]] for i in range(n)]
+    neighbors = vecinos_compatibles(coords, peptides, d)
+    with instrumentacion.fase("red"):
+        peptides_masks = internar_peptidos(peptides)
+
+        # A type 1 cell cannot send, nor a type 3 cell receive, more than the
+        # peptides it shares with its calculators: that is the exact capacity
+        # of its edge from the source or to the sink
+        links = []
+        bound = [0] * n
+        for i in range(n):
+            type1 = types[i]
+            mask1 = peptides_masks[i]
 
-        calculators = []
-        max_capacity = float("inf")
-        peptides_cache = {}
-        coords = []
-        id_map = {}
+            for j in neighbors[i]:
+                type2 = types[j]
+
+                shared_peptides = popcount(mask1 & peptides_masks[j])
+                if type1 == 1 and type2 == 2:
+                    links.append((i, j, shared_peptides))
+                    bound[i] += shared_peptides
+                elif type1 == 2 and type2 == 2:
+                    links.append((i, j, shared_peptides))
+                elif type1 == 2 and type2 == 3:
+                    links.append((i, j, shared_peptides))
+                    bound[j] += shared_peptides
 
         for i in range(n):
-            id1, x1, y1, type1, *peptides1 = cells[i]
-            coords.append((x1, y1))
-            id_map[(x1, y1)] = (id1, type1, peptides1)
-
+            type1 = types[i]
             if type1 == 1:
-                graph.add_edge(source, id1, max_capacity)
-            elif type1 == 2:
-                calculators.append(id1)
+                graph.add_edge(source, i, bound[i])
             elif type1 == 3:
-                graph.add_edge(id1, sink, max_capacity)
-
-        neighbors = grid_neighbors(coords, d)
-
-        for i in range(n):
-            id1, x1, y1, type1, *peptides1 = cells[i]
-            peptides_cache[id1] = set(peptides1)
-
-            for j in neighbors[i]:
-                id2, x2, y2, type2, *peptides2 = cells[j]
-
-                if id2 not in peptides_cache:
-                    peptides_cache[id2] = set(peptides2)
-
-                shared_peptides = len(peptides_cache[id1] & peptides_cache[id2])
-                if shared_peptides > 0:
-                    if type1 == 1 and type2 == 2:
-                        graph.add_edge(id1, id2, shared_peptides)
-                    elif type1 == 2 and type2 == 2:
-                        graph.add_edge(id1, id2, shared_peptides)
-                    elif type1 == 2 and type2 == 3:
-                        graph.add_edge(id1, id2, shared_peptides)
-
-        total_flow = graph.dinic(source, sink)
-
+                graph.add_edge(i, sink, bound[i])
+
+        for i, j, shared_peptides in links:
+            graph.add_edge(i, j, shared_peptides)
+
+    # The peptide ANDs are counted by vecinos_compatibles; the popcount above
+    # runs once per compatible pair, twice the "aristas" counter
+    instrumentacion.contar("aristas_red", len(graph.to) // 2)
+
+    return graph, source, sink, calculators
+
+def solve_network(graph, source, sink, ids, calculators):
+    # The max flow of the full network feeds flow_per_node (the percentile
+    # filter), the throughput bounds and the flow report, so it always comes
+    # from Dinic: another backend may find a different max flow of the same
+    # value. --algo only picks the backend for the blocked networks, where
+    # nothing but the flow value is used
+    with instrumentacion.fase("flujo"):
+        total_flow = graph.max_flow(source, sink, algorithm="dinic")
+
+    if SEARCH == "exact":
+        # Blocking a calculator cannot remove more flow than goes through
+        # it, so the candidates with most throughput go first
+        throughput = {node: graph.throughput(node) for node in calculators}
+        candidates = sorted(calculators, key=lambda node: throughput[node], reverse=True)
+    else:
         flow_values = [graph.flow_per_node[calc] for calc in calculators]
-        threshold = np.percentile(flow_values, 80)
-        top_calculators = [calc for calc in calculators if graph.flow_per_node[calc] >= threshold]
+        threshold = percentile(flow_values, 80)
+        candidates = [calc for calc in calculators if graph.flow_per_node[calc] >= threshold]
+        throughput = None
+
+    max_reduction = total_flow
+    blocked_cell = -1
+    evaluated = 0
+    pruned = 0
+
+    with instrumentacion.fase("bloqueo"):
+        pool = None
+        if BLOCKING_JOBS != 1 and len(candidates) > 1:
+            pool = paralelo.crear_pool(BLOCKING_JOBS, _init_blocking_worker,
+                                       (graph.snapshot(), source, sink, BLOCKING, ALGORITHM))
+
+        # The pool is closed even if an evaluation fails, so no workers are left behind
+        try:
+            # Candidates go in batches, one per worker; the bounds use the best
+            # result of the previous batches
+            batch_size = paralelo.numero_procesos(BLOCKING_JOBS) if pool is not None else 1
+            position = 0
+            while position < len(candidates):
+                batch = []
+                while position < len(candidates) and len(batch) < batch_size:
+                    node = candidates[position]
+                    position += 1
+                    calc = ids[node]
+
+                    if throughput is not None:
+                        bound = total_flow - throughput[node]
+                        if bound > max_reduction or (bound == max_reduction and calc < blocked_cell):
+                            pruned += 1
+                            continue
+                        if throughput[node] == 0:
+                            # Nothing goes through it: blocking it leaves the flow as is
+                            pruned += 1
+                            if total_flow == max_reduction and calc > blocked_cell:
+                                blocked_cell = calc
+                            continue
+                    batch.append(node)
+
+                if pool is not None:
+                    flows = pool.map(_blocked_flow, batch)
+                elif BLOCKING == "incremental":
+                    flows = [graph.blocked_flow(source, sink, node) for node in batch]
+                else:
+                    flows = [graph.max_flow(source, sink, blocked=node) for node in batch]
+                evaluated += len(batch)
+
+                for node, reduced_flow in zip(batch, flows):
+                    calc = ids[node]
+                    if reduced_flow < max_reduction:
+                        max_reduction = reduced_flow
+                        blocked_cell = calc
+                    elif reduced_flow == max_reduction and calc > blocked_cell:
+                        max_reduction = reduced_flow
+                        blocked_cell = calc
+        finally:
+            if pool is not None:
+                pool.terminate()
+    instrumentacion.contar("calculadoras_evaluadas", evaluated)
+    instrumentacion.contar("calculadoras_podadas", pruned)
+
+    report = None
+    if FLOW_REPORT:
+        with instrumentacion.fase("reporte"):
+            report = flow_report(graph, ids, source, sink)
+    return blocked_cell, total_flow, max_reduction, evaluated, pruned, report
 
-        max_reduction = total_flow
-        blocked_cell = -1
-
-        for calc in top_calculators:
-            reduced_flow = graph.dinic(source, sink, blocked=calc)
-            if reduced_flow < max_reduction:
-                max_reduction = reduced_flow
-                blocked_cell = calc
-            elif reduced_flow == max_reduction and calc > blocked_cell:
-                max_reduction = reduced_flow
-                blocked_cell = calc
-
-        results.append((blocked_cell, total_flow, max_reduction))
+def calculate_cells(cases):
+    results = []
+    for case in cases:
+        n, d, columns, offsets, peptide_list = case
+        graph, source, sink, calculators = build_network(n, d, columns, offsets, peptide_list)
+        results.append(solve_network(graph, source, sink, columns[0], calculators))
+        instrumentacion.emitir(n=n, d=d)
 
     return results
 
+def flow_report(graph, ids, source, sink):
+    # Per-edge flows and path decomposition of the max flow, one list per
+    # column. Nodes are cell ids, with -1 for the source and -2 for the sink;
+    # the cells of path k are cells[offsets[k]:offsets[k + 1]]
+    labels = list(ids) + [-1, -2]
+    edge_from, edge_to, edge_flow = [], [], []
+    for u, v, flow in graph.edge_flows():
+        edge_from.append(labels[u])
+        edge_to.append(labels[v])
+        edge_flow.append(flow)
+
+    path_flow, path_offsets, path_cells = [], [0], []
+    for flow, nodes in graph.decompose(source, sink):
+        path_flow.append(flow)
+        path_cells.extend(labels[u] for u in nodes)
+        path_offsets.append(len(path_cells))
+
+    return {
+        "edges": {"from": edge_from, "to": edge_to, "flow": edge_flow},
+        "paths": {"flow": path_flow, "offsets": path_offsets, "cells": path_cells},
+    }
+
+def parse_case(text):
+    # Columns id, x, y, type plus the peptides of each cell
+    return parsear_columnas(text, 4)
+
+def configure(backend, mode, blocking, search, blocking_jobs, algorithm, flow_report, instrument=False):
+    global BLOCKING, SEARCH, BLOCKING_JOBS, ALGORITHM, FLOW_REPORT
+    vecinos.configurar(backend, mode)
+    instrumentacion.activar(instrument)
+    BLOCKING = blocking
+    SEARCH = search
+    BLOCKING_JOBS = blocking_jobs
+    ALGORITHM = algorithm
+    FLOW_REPORT = flow_report
+
+def solve_case_text(text):
+    return calculate_cells([parse_case(text)])[0]
+
 if __name__ == "__main__":
-    cases = []
-    t = int(input().strip())
-    for _ in range(t):
-        n, d = map(int, input().strip().split())
-        cells = []
-        for _ in range(n):
-            data = input().strip().split()
-            cell_id = int(data[0])
-            x, y = int(data[1]), int(data[2])
-            cell_type = int(data[3])
-            peptides = data[4:]
-            cells.append((cell_id, x, y, cell_type, *peptides))
-        cases.append((n, d, cells))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vecinos", choices=vecinos.BACKENDS, default=vecinos.BACKEND,
+                        help="backend para buscar vecinos en la cuadrícula")
+    parser.add_argument("--candidatos", choices=vecinos.MODOS, default=vecinos.MODO,
+                        help="generar los pares candidatos por cuadrícula, por péptidos o elegir por caso")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="procesos para resolver casos en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--bloqueo", choices=BLOCKING_MODES, default=BLOCKING,
+                        help="evaluar cada calculadora bloqueada reusando el flujo máximo o desde cero")
+    parser.add_argument("--busqueda", choices=SEARCH_MODES, default=SEARCH,
+                        help="probar solo el 20%% de calculadoras con más flujo o todas, con poda por cotas")
+    parser.add_argument("--jobs-bloqueo", type=int, default=BLOCKING_JOBS,
+                        help="procesos para evaluar en paralelo las calculadoras bloqueadas de cada caso (0 = todos los núcleos)")
+    parser.add_argument("--algo", choices=ALGORITHMS, default=ALGORITHM,
+                        help="algoritmo de flujo máximo; auto elige según la densidad de aristas")
+    parser.add_argument("--flujos", metavar="ARCHIVO", default=None,
+                        help="escribir en ARCHIVO, una línea JSON por caso, el flujo de cada arista y su descomposición en caminos")
+    instrumentacion.agregar_opcion(parser)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="mostrar cuánto cuesta importar cada módulo al arrancar y salir")
+    args = parser.parse_args()
+    if args.profile_startup:
+        import perfil
+        perfil.imprimir_perfil_arranque("p2", __file__)
+        sys.exit()
+    if args.jobs != 1 and args.jobs_bloqueo != 1:
+        parser.error("--jobs y --jobs-bloqueo no se pueden combinar")
+
+    # Each worker gets the raw text of its case and parses it itself
+    texts = list(leer_casos_texto(sys.stdin.buffer))
+    configuration = (args.vecinos, args.candidatos, args.bloqueo, args.busqueda, args.jobs_bloqueo, args.algo,
+                     args.flujos is not None, args.instrumentar)
 
     start_time = time.time()
-    results = calculate_cells(cases)
+    results = list(paralelo.mapear(solve_case_text, texts, args.jobs, configure, configuration))
     end_time = time.time()
 
     print(f"Execution time: {end_time - start_time:.6f} seconds")
 
-    for result in results:
+    for case, result in enumerate(results, 1):
         print(f"{result[0]} {result[1]} {result[2]}")
+        if args.busqueda == "exact":
+            print(f"Caso {case}: {result[3]} calculadoras evaluadas, {result[4]} podadas", file=sys.stderr)
+
+    if args.flujos is not None:
+        import json
+        with open(args.flujos, "w") as output:
+            for case, result in enumerate(results, 1):
+                output.write(json.dumps({"case": case, **result[5]}, separators=(",", ":")) + "\n")
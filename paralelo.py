@@ -0,0 +1,50 @@
+import os
+
+
+def numero_procesos(jobs):
+    """
+    Número de procesos que corresponde a la opción --jobs (0 = todos los núcleos).
+    """
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def mapear(funcion, textos, jobs=1, inicializar=None, argumentos=()):
+    """
+    Aplica `funcion` al texto crudo de cada caso y produce los resultados en el
+    mismo orden de entrada.
+
+    Con jobs > 1 los casos se reparten en un pool de procesos; cada trabajador
+    recibe solo el texto del caso, no objetos de Python ya construidos. Con
+    jobs == 0 se usan todos los núcleos. `inicializar(*argumentos)` se llama
+    una vez en cada proceso que resuelve casos.
+    """
+    jobs = numero_procesos(jobs)
+
+    if jobs <= 1:
+        if inicializar is not None:
+            inicializar(*argumentos)
+        for texto in textos:
+            yield funcion(texto)
+        return
+
+    # multiprocessing solo se importa si hace falta: cuesta más que el resto del arranque
+    from multiprocessing import Pool
+
+    with Pool(jobs, initializer=inicializar, initargs=argumentos) as pool:
+        # imap respeta el orden de entrada aunque los casos terminen desordenados
+        yield from pool.imap(funcion, textos)
+
+
+def crear_pool(jobs, inicializar=None, argumentos=()):
+    """
+    Crea un pool de `jobs` procesos (0 = todos los núcleos), o devuelve None si
+    con un proceso basta. Quien lo crea debe cerrarlo.
+    """
+    jobs = numero_procesos(jobs)
+    if jobs <= 1:
+        return None
+    from multiprocessing import Pool
+
+    return Pool(jobs, initializer=inicializar, initargs=argumentos)
@@ -0,0 +1,32 @@
+def internar_peptidos(listas_peptidos, vocabulario=None):
+    """
+    Asigna un id entero a cada péptido y devuelve la máscara de bits de cada lista.
+
+    Dos células comparten algún péptido si `mascaras[i] & mascaras[j]` es
+    distinto de cero, sin construir conjuntos intermedios. Los enteros de Python
+    no tienen tamaño fijo, así que la máscara sirve para cualquier vocabulario.
+    """
+    if vocabulario is None:
+        vocabulario = {}
+
+    mascaras = []
+    for peptidos in listas_peptidos:
+        mascara = 0
+        for peptido in peptidos:
+            bit = vocabulario.get(peptido)
+            if bit is None:
+                bit = vocabulario[peptido] = len(vocabulario)
+            mascara |= 1 << bit
+        mascaras.append(mascara)
+
+    return mascaras
+
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(mascara):
+        """
+        Cuenta los péptidos presentes en una máscara.
+        """
+        return bin(mascara).count("1")
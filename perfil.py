@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+
+def perfil_arranque(modulo, directorio=None):
+    """
+    Mide lo que cuesta importar `modulo` en un intérprete nuevo con
+    `python -X importtime`.
+
+    Devuelve una lista de (módulo, propio, acumulado) en microsegundos, de
+    mayor a menor costo acumulado.
+    """
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                             cwd=directorio, capture_output=True, text=True, check=True)
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not propio.strip().isdigit():
+            continue  # Cabecera de la tabla
+        filas.append((nombre.strip(), int(propio), int(acumulado)))
+    filas.sort(key=lambda fila: fila[2], reverse=True)
+    return filas
+
+
+def imprimir_perfil_arranque(modulo, archivo, limite=20, salida=None):
+    """
+    Imprime los módulos más caros de importar al arrancar el script `archivo`.
+    """
+    salida = salida or sys.stdout
+    filas = perfil_arranque(modulo, os.path.dirname(os.path.abspath(archivo)))
+    print(f"{'acumulado (ms)':>15} {'propio (ms)':>12}  módulo", file=salida)
+    for nombre, propio, acumulado in filas[:limite]:
+        print(f"{acumulado / 1000:15.2f} {propio / 1000:12.2f}  {nombre}", file=salida)
@@ -0,0 +1,162 @@
+import argparse
+import sys
+import time
+
+import vecinos
+from grafo import GrafoCSR, construir_grafo
+from lector import leer_casos_texto, parsear_caso, formatear_resultado
+from torneo import grupos_por_numero
+from validador import validar
+import greedy_final
+import new
+import greedy_brayan
+import paralelo
+
+# Segundos, después del plazo, que se espera a que llegue el resultado de una
+# estrategia que respeta el plazo (como cubrir_grafo) antes de cancelarla.
+GRACIA = 0.05
+
+
+# Cada estrategia recibe el grafo y el plazo del caso (segundos de
+# time.time(), o None) y devuelve los cliques como listas de nodos.
+# greedy_clique_cover (greedy2.py) no entra: sus cliques se solapan.
+ESTRATEGIAS = {
+    "cubrir_grafo": lambda grafo, plazo: grupos_por_numero(grafo, greedy_final.cubrir_grafo(grafo, plazo)),
+    "minimum_clique_cover": lambda grafo, plazo: [
+        clique for componente in greedy_final.componentes_conexas(grafo)
+        for clique in greedy_final.minimum_clique_cover(grafo, componente)
+    ],
+    "find_approximate_cliques": lambda grafo, plazo: greedy_brayan.find_approximate_cliques(grafo),
+}
+
+
+def _correr(nombre, descripcion, plazo):
+    """
+    Corre una estrategia en un trabajador sobre el grafo en memoria compartida.
+    """
+    from multiprocessing import shared_memory
+
+    nombre_bloque, tamaños = descripcion
+    try:
+        bloque = shared_memory.SharedMemory(name=nombre_bloque, track=False)
+    except TypeError:
+        # Antes de Python 3.13 abrir el bloque también lo registra; el
+        # rastreador de recursos es el del proceso principal (ver main)
+        bloque = shared_memory.SharedMemory(name=nombre_bloque)
+    vista = memoryview(bloque.buf)
+    try:
+        grafo = GrafoCSR.desde_compartido(vista, tamaños)
+        cliques = [list(clique) for clique in ESTRATEGIAS[nombre](grafo, plazo)]
+        # El bloque solo se puede cerrar cuando no quedan vistas sobre él
+        del grafo
+        return cliques
+    finally:
+        vista.release()
+        bloque.close()
+
+
+def competir(grafo, estrategias, pool, plazo=None):
+    """
+    Resuelve el grafo con todas las estrategias y se queda con la cobertura
+    válida de menos cliques.
+
+    clique_aproximation corre en este proceso mientras las demás compiten en
+    `pool`, así siempre hay una respuesta. Las que no terminan antes de
+    `plazo` se descartan. Devuelve (cliques, ganadora, cancelada): si alguna
+    estrategia se canceló, el pool quedó con trabajo pendiente y hay que
+    reemplazarlo.
+    """
+    pendientes = []
+    bloque = None
+    if pool is not None:
+        try:
+            bloque, descripcion = grafo.compartir()
+        except OverflowError:
+            # Con ids que no caben en 64 bits el grafo no se puede compartir:
+            # las estrategias corren en este proceso
+            pool = None
+    if pool is not None:
+        pendientes = [(nombre, pool.apply_async(_correr, (nombre, descripcion, plazo)))
+                      for nombre in estrategias]
+
+    mejor = grupos_por_numero(grafo, new.clique_aproximation(grafo))
+    ganadora = "clique_aproximation"
+    cancelada = False
+
+    def considerar(nombre, cliques):
+        nonlocal mejor, ganadora
+        if len(cliques) < len(mejor) and validar(grafo, cliques) is None:
+            mejor, ganadora = cliques, nombre
+
+    try:
+        if pool is None:
+            for nombre in estrategias:
+                if plazo is not None and time.time() >= plazo:
+                    break
+                considerar(nombre, ESTRATEGIAS[nombre](grafo, plazo))
+        for nombre, resultado in pendientes:
+            espera = None if plazo is None else max(0.0, plazo + GRACIA - time.time())
+            resultado.wait(espera)
+            if resultado.ready():
+                considerar(nombre, resultado.get())
+            else:
+                cancelada = True
+    finally:
+        if bloque is not None:
+            bloque.close()
+            bloque.unlink()
+
+    return mejor, ganadora, cancelada
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resuelve cada caso con varias heurísticas en paralelo y se queda con la mejor cobertura.")
+    parser.add_argument("--vecinos", choices=vecinos.BACKENDS, default=vecinos.BACKEND,
+                        help="backend para buscar vecinos en la cuadrícula")
+    parser.add_argument("--candidatos", choices=vecinos.MODOS, default=vecinos.MODO,
+                        help="generar los pares candidatos por cuadrícula, por péptidos o elegir por caso")
+    parser.add_argument("--estrategias", nargs="+", choices=list(ESTRATEGIAS), default=list(ESTRATEGIAS),
+                        help="estrategias que compiten, además de clique_aproximation")
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="procesos para las estrategias (0 = todos los núcleos, 1 = una tras otra)")
+    parser.add_argument("--tiempo-caso", type=float, default=None,
+                        help="segundos por caso; las estrategias que no terminan se cancelan")
+    parser.add_argument("--ganadoras", action="store_true",
+                        help="escribir en stderr qué estrategia ganó cada caso")
+    args = parser.parse_args()
+    vecinos.configurar(args.vecinos, args.candidatos)
+
+    # Sin más de un núcleo no hay carrera: las estrategias corren una tras otra
+    jobs = min(paralelo.numero_procesos(args.jobs), len(args.estrategias))
+    if jobs > 1:
+        # Los trabajadores heredan el rastreador de recursos ya iniciado, así
+        # los bloques compartidos quedan a cargo de un solo rastreador, que
+        # no los da por perdidos cuando el proceso principal los libera
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+    pool = paralelo.crear_pool(jobs)
+    try:
+        for k, texto in enumerate(leer_casos_texto(sys.stdin.buffer), 1):
+            plazo = None if args.tiempo_caso is None else time.time() + args.tiempo_caso
+            n, d, filas = parsear_caso(texto)
+            celulas = [(int(fila[0]), int(fila[1]), int(fila[2]), set(fila[3:])) for fila in filas]
+            grafo = construir_grafo(celulas, d)
+
+            cliques, ganadora, cancelada = competir(grafo, args.estrategias, pool, plazo)
+            if cancelada:
+                pool.terminate()
+                pool = paralelo.crear_pool(jobs)
+
+            resultado = {grafo.ids[nodo]: numero for numero, clique in enumerate(cliques, 1) for nodo in clique}
+            sys.stdout.write(formatear_resultado(resultado))
+            sys.stdout.flush()
+            if args.ganadoras:
+                print(f"Caso {k}: {ganadora}, {len(cliques)} cliques", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import sys
+import time
+
+import vecinos
+from grafo import construir_grafo
+from lector import leer_casos_texto, parsear_caso, formatear_resultado
+import paralelo
+import instrumentacion
+import cache_grafos
+
+# Opciones del proceso que resuelve los casos; las fija configurar. RESOLVER
+# recibe el grafo de un caso (y su plazo, si lo tiene) y devuelve el número
+# de clique de cada célula, por id. CAMPOS es el número de columnas
+# numéricas antes de los péptidos: 3 en P3 y 4 en P2. TIEMPO_CASO son los
+# segundos por caso de --tiempo-caso; None si el caso no tiene plazo propio.
+RESOLVER = None
+CAMPOS = 3
+TIEMPO_CASO = None
+
+
+def crear_parser(plazos=False):
+    """
+    Parser con las opciones que comparten los solvers de cobertura por
+    cliques. Con `plazos` agrega --tiempo-caso y --tiempo-total.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vecinos", choices=vecinos.BACKENDS, default=vecinos.BACKEND,
+                        help="backend para buscar vecinos en la cuadrícula")
+    parser.add_argument("--candidatos", choices=vecinos.MODOS, default=vecinos.MODO,
+                        help="generar los pares candidatos por cuadrícula, por péptidos o elegir por caso")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="procesos para resolver casos en paralelo (0 = todos los núcleos)")
+    if plazos:
+        plazo = parser.add_mutually_exclusive_group()
+        plazo.add_argument("--tiempo-caso", type=float, default=None,
+                           help="segundos por caso; el tiempo que sobra se usa para mejorar la cobertura")
+        plazo.add_argument("--tiempo-total", type=float, default=None,
+                           help="segundos para todo el archivo, repartidos según el tamaño de cada caso")
+    instrumentacion.agregar_opcion(parser)
+    parser.add_argument("--cache", metavar="CARPETA", default=None,
+                        help="guardar en CARPETA los grafos construidos y reusarlos en las siguientes ejecuciones")
+    parser.add_argument("--cache-mb", type=int, default=cache_grafos.LIMITE_MB,
+                        help="tamaño máximo de la caché de grafos; se borran primero los usados hace más tiempo")
+    return parser
+
+
+def configurar(resolver, campos, backend, modo, instrumentar=False, cache=None, cache_mb=cache_grafos.LIMITE_MB,
+               tiempo_caso=None, inicializar=None, argumentos=()):
+    """
+    Fija las opciones del proceso que resuelve los casos. `inicializar(*argumentos)`
+    fija las opciones propias del solver.
+    """
+    global RESOLVER, CAMPOS, TIEMPO_CASO
+    RESOLVER = resolver
+    CAMPOS = campos
+    TIEMPO_CASO = tiempo_caso
+    vecinos.configurar(backend, modo)
+    instrumentacion.activar(instrumentar)
+    cache_grafos.configurar(cache, cache_mb)
+    if inicializar is not None:
+        inicializar(*argumentos)
+
+
+def grafo_desde_texto(texto):
+    """
+    Construye el grafo de un caso a partir de su texto crudo.
+    """
+    n, d, filas = parsear_caso(texto)
+    celulas = [(int(fila[0]), int(fila[1]), int(fila[2]), set(fila[CAMPOS:])) for fila in filas]
+    return construir_grafo(celulas, d)
+
+
+def resolver_texto(caso):
+    """
+    Resuelve un caso a partir de su texto crudo y devuelve sus líneas de salida.
+
+    `caso` es la tupla (texto, plazo); el plazo del archivo, si lo hay, se
+    combina con TIEMPO_CASO. Sin plazo, RESOLVER recibe solo el grafo.
+    """
+    texto, plazo = caso
+    if TIEMPO_CASO is not None:
+        plazo_caso = time.time() + TIEMPO_CASO
+        plazo = plazo_caso if plazo is None else min(plazo, plazo_caso)
+    grafo = cache_grafos.obtener(texto, CAMPOS, grafo_desde_texto)
+    resultado = RESOLVER(grafo) if plazo is None else RESOLVER(grafo, plazo)
+    salida = formatear_resultado(resultado)
+    n, d = map(int, texto.split(None, 2)[:2])
+    instrumentacion.emitir(n=n, d=d)
+    return salida
+
+
+def plazos_por_tamaño(textos, segundos):
+    """
+    Reparte `segundos` entre los casos en proporción a su número de células y
+    devuelve el plazo absoluto de cada uno, en orden.
+    """
+    tamaños = [int(texto.split(None, 1)[0]) for texto in textos]
+    total = sum(tamaños) or 1
+    inicio = time.time()
+    acumulado = 0
+    plazos = []
+    for tamaño in tamaños:
+        acumulado += tamaño
+        plazos.append(inicio + segundos * acumulado / total)
+    return plazos
+
+
+def ejecutar(args, resolver, campos=3, inicializar=None, argumentos=()):
+    """
+    Resuelve los casos de la entrada estándar con las opciones de un parser
+    de crear_parser y escribe la salida de cada uno apenas se resuelve,
+    siempre en el orden de entrada.
+    """
+    textos = leer_casos_texto(sys.stdin.buffer)
+    tiempo_total = getattr(args, "tiempo_total", None)
+    if tiempo_total is None:
+        casos = ((texto, None) for texto in textos)
+    else:
+        textos = list(textos)
+        casos = zip(textos, plazos_por_tamaño(textos, tiempo_total))
+    configuracion = (resolver, campos, args.vecinos, args.candidatos, args.instrumentar, args.cache, args.cache_mb,
+                     getattr(args, "tiempo_caso", None), inicializar, argumentos)
+    for salida in paralelo.mapear(resolver_texto, casos, args.jobs, configurar, configuracion):
+        sys.stdout.write(salida)
+        sys.stdout.flush()
+
+
+def main(resolver, campos=3):
+    """
+    Programa completo de un solver sin opciones propias.
+    """
+    ejecutar(crear_parser().parse_args(), resolver, campos)
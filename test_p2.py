@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def _resolver(*opciones):
+    with open(os.path.join(DIRECTORIO, "P2_cases.in"), "rb") as casos:
+        proceso = subprocess.run([sys.executable, os.path.join(DIRECTORIO, "p2.py"), *opciones],
+                                 stdin=casos, capture_output=True, check=True, cwd=DIRECTORIO)
+    # La primera línea es el tiempo de ejecución
+    return proceso.stdout.decode().splitlines()[1:]
+
+
+@pytest.mark.parametrize("busqueda, bloqueo", [
+    ("percentile", "incremental"),
+    ("exact", "incremental"),
+])
+def test_algoritmos_de_flujo_dan_la_misma_salida(busqueda, bloqueo):
+    opciones = ("--busqueda", busqueda, "--bloqueo", bloqueo)
+    dinic = _resolver("--algo", "dinic", *opciones)
+    assert _resolver("--algo", "push-relabel", *opciones) == dinic
+    assert _resolver("--algo", "auto", *opciones) == dinic
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import time
+
+from grafo import construir_grafo
+from lector import leer_casos_texto, parsear_caso
+from validador import validar, cota
+import greedy_final
+import new
+import greedy_brayan
+import greedy2
+import greedy
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Componentes con a lo sumo COTA_MAX_NODOS nodos usan el conjunto
+# independiente máximo como cota; las demás, el greedy de cota_inferior.
+COTA_MAX_NODOS = 200
+
+
+def grupos_por_numero(grafo, asignacion):
+    """
+    Convierte una asignación id -> número de clique en listas de nodos.
+    """
+    posicion = {id_celula: nodo for nodo, id_celula in enumerate(grafo.ids)}
+    grupos = {}
+    for id_celula, numero in asignacion.items():
+        grupos.setdefault(numero, []).append(posicion[id_celula])
+    return list(grupos.values())
+
+
+# Cada estrategia recibe el grafo ya construido y devuelve los grupos como
+# listas (o conjuntos) de nodos del grafo.
+ESTRATEGIAS = {
+    # Como en greedy_final, una componente conexa a la vez
+    "minimum_clique_cover": lambda grafo: [
+        clique for componente in greedy_final.componentes_conexas(grafo)
+        for clique in greedy_final.minimum_clique_cover(grafo, componente)
+    ],
+    "cubrir_grafo": lambda grafo: grupos_por_numero(grafo, greedy_final.cubrir_grafo(grafo)),
+    "clique_aproximation": lambda grafo: grupos_por_numero(grafo, new.clique_aproximation(grafo)),
+    "find_approximate_cliques": lambda grafo: greedy_brayan.find_approximate_cliques(grafo),
+    "greedy_clique_cover": lambda grafo: greedy2.greedy_clique_cover(grafo),
+    "greedy_componentes_clique": lambda grafo: grupos_por_numero(grafo, greedy.greedy_componentes_clique(grafo)),
+}
+
+
+def jugar_caso(texto, estrategias):
+    """
+    Construye el grafo de un caso una vez y lo resuelve con cada estrategia.
+    """
+    n, d, filas_texto = parsear_caso(texto)
+    celulas = [(int(fila[0]), int(fila[1]), int(fila[2]), set(fila[3:])) for fila in filas_texto]
+    grafo = construir_grafo(celulas, d)
+    caso = {"n": n, "d": d, "cota": cota(grafo, COTA_MAX_NODOS), "estrategias": {}}
+
+    for nombre in estrategias:
+        inicio = time.perf_counter()
+        grupos = ESTRATEGIAS[nombre](grafo)
+        segundos = time.perf_counter() - inicio
+        caso["estrategias"][nombre] = {
+            "cliques": len(grupos),
+            "segundos": segundos,
+            "error": validar(grafo, grupos),
+        }
+    return caso
+
+
+def main():
+    global COTA_MAX_NODOS
+    parser = argparse.ArgumentParser(
+        description="Compara las heurísticas de cobertura por cliques sobre los mismos grafos.")
+    parser.add_argument("archivo", nargs="?", default="P3_cases_Def.in",
+                        help="archivo de casos en formato P3")
+    parser.add_argument("--estrategias", nargs="+", choices=list(ESTRATEGIAS), default=list(ESTRATEGIAS),
+                        help="estrategias a comparar")
+    parser.add_argument("--cota-max-nodos", type=int, default=COTA_MAX_NODOS,
+                        help="tamaño máximo de componente en que la cota usa el conjunto independiente máximo")
+    parser.add_argument("--por-caso", action="store_true",
+                        help="mostrar también los resultados de cada caso")
+    parser.add_argument("--salida", default=None,
+                        help="archivo JSON donde guardar los resultados de cada caso")
+    args = parser.parse_args()
+    COTA_MAX_NODOS = args.cota_max_nodos
+
+    casos = []
+    with open(os.path.join(DIRECTORIO, args.archivo), "rb") as flujo:
+        for k, texto in enumerate(leer_casos_texto(flujo), 1):
+            caso = jugar_caso(texto, args.estrategias)
+            casos.append(caso)
+            if args.por_caso:
+                for nombre, r in caso["estrategias"].items():
+                    print(f"caso {k:3} {nombre:26} {r['cliques']:7} {r['segundos']:9.4f} "
+                          f"{r['cliques'] - caso['cota']:6} {'ok' if r['error'] is None else r['error']}")
+
+    cota_total = sum(caso["cota"] for caso in casos)
+    print(f"{len(casos)} casos, cota inferior total: {cota_total}")
+    print(f"{'estrategia':26} {'cliques':>8} {'segundos':>9} {'brecha':>7} {'brecha %':>9} "
+          f"{'óptimos':>8} {'inválidos':>10}")
+    for nombre in args.estrategias:
+        resultados = [caso["estrategias"][nombre] for caso in casos]
+        cliques = sum(r["cliques"] for r in resultados)
+        segundos = sum(r["segundos"] for r in resultados)
+        optimos = sum(r["cliques"] == caso["cota"] and r["error"] is None
+                      for r, caso in zip(resultados, casos))
+        invalidos = sum(r["error"] is not None for r in resultados)
+        brecha = cliques - cota_total
+        print(f"{nombre:26} {cliques:8} {segundos:9.3f} {brecha:7} "
+              f"{100 * brecha / (cota_total or 1):8.2f}% {optimos:8} {invalidos:10}")
+
+    if args.salida:
+        with open(args.salida, "w") as salida:
+            json.dump(casos, salida, indent=2)
+
+
+if __name__ == "__main__":
+    main()
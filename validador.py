@@ -0,0 +1,141 @@
+import argparse
+import sys
+
+from grafo import construir_grafo
+from peptidos import popcount
+from cobertura_exacta import cota_inferior, independiente_maximo
+from lector import leer_casos_texto, parsear_caso
+import greedy_final
+
+
+def validar(grafo, grupos):
+    """
+    Comprueba que `grupos` (listas de nodos) sea una partición del grafo en
+    cliques.
+
+    Cada grupo se revisa con las filas de bits de su propio subgrafo, de
+    len(grupo) bits, así que el costo es proporcional a las aristas del
+    grupo más la suma de len(grupo)² / 64. Devuelve None si la partición es
+    válida o un texto con el primer problema encontrado.
+    """
+    visto = bytearray(len(grafo))
+    for grupo in grupos:
+        grupo = list(grupo)
+        for v in grupo:
+            if visto[v]:
+                return f"el nodo {v} aparece en más de un grupo"
+            visto[v] = 1
+
+        todos = (1 << len(grupo)) - 1
+        for k, fila in enumerate(grafo.filas_bits(grupo)):
+            if fila | 1 << k != todos:
+                return f"el grupo del nodo {grupo[k]} no es un clique"
+
+    if not all(visto):
+        return f"el nodo {visto.index(0)} no tiene grupo"
+    return None
+
+
+def cota(grafo, max_nodos_exacta=0):
+    """
+    Cota inferior del número de cliques: la suma, por componente conexa, de
+    un conjunto independiente. Dos nodos no adyacentes nunca comparten
+    clique, así que cada nodo del conjunto necesita uno distinto.
+
+    En las componentes de a lo sumo `max_nodos_exacta` nodos el conjunto es
+    el máximo (independiente_maximo); en las demás, el greedy de cota_inferior.
+    """
+    total = 0
+    for componente in greedy_final.componentes_conexas(grafo):
+        if len(componente) == 1:
+            total += 1
+            continue
+        filas = grafo.filas_bits(componente)
+        if len(componente) <= max_nodos_exacta:
+            total += popcount(independiente_maximo(filas))
+        else:
+            total += popcount(cota_inferior(filas))
+    return total
+
+
+def leer_asignacion(lineas, n):
+    """
+    Lee las `n` líneas `id clique` de un caso de la salida.
+    """
+    asignacion = {}
+    for _ in range(n):
+        id_celula, clique = next(lineas).split()
+        asignacion[int(id_celula)] = int(clique)
+    return asignacion
+
+
+def certificar(texto, asignacion, campos=3, max_nodos_exacta=0):
+    """
+    Valida la asignación id -> clique de un caso y calcula su cota inferior.
+
+    Devuelve (cliques, cota, error), con error None si la asignación es una
+    partición en cliques de todas las células del caso.
+    """
+    n, d, filas = parsear_caso(texto)
+    celulas = [(int(fila[0]), int(fila[1]), int(fila[2]), set(fila[campos:])) for fila in filas]
+    grafo = construir_grafo(celulas, d)
+
+    posicion = {id_celula: nodo for nodo, id_celula in enumerate(grafo.ids)}
+    grupos = {}
+    error = None
+    for id_celula, clique in asignacion.items():
+        nodo = posicion.get(id_celula)
+        if nodo is None:
+            error = f"la célula {id_celula} no está en el caso"
+            break
+        grupos.setdefault(clique, []).append(nodo)
+    if error is None:
+        error = validar(grafo, grupos.values())
+    return len(grupos), cota(grafo, max_nodos_exacta), error
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Valida una salida de cobertura por cliques y muestra la brecha con una cota inferior.")
+    parser.add_argument("casos", help="archivo de casos")
+    parser.add_argument("salida", help="salida del solver: líneas `id clique` de cada caso, en orden")
+    parser.add_argument("--formato", choices=("P3", "P2"), default="P3",
+                        help="formato del archivo de casos (P2 tiene además la columna de tipo)")
+    parser.add_argument("--cota-max-nodos", type=int, default=0,
+                        help="tamaño máximo de componente en que la cota usa el conjunto independiente máximo")
+    args = parser.parse_args()
+    campos = 3 if args.formato == "P3" else 4
+
+    invalidos = 0
+    total_cliques = 0
+    total_cota = 0
+    with open(args.casos, "rb") as casos, open(args.salida) as salida:
+        lineas = (linea for linea in salida if linea.strip())
+        for k, texto in enumerate(leer_casos_texto(casos), 1):
+            n = int(texto.split(None, 1)[0])
+            try:
+                asignacion = leer_asignacion(lineas, n)
+            except StopIteration:
+                print(f"Caso {k}: la salida termina antes de tiempo")
+                invalidos += 1
+                break
+            cliques, cota_caso, error = certificar(texto, asignacion, campos, args.cota_max_nodos)
+            if error is not None:
+                invalidos += 1
+                print(f"Caso {k}: INVÁLIDO, {error}")
+            else:
+                total_cliques += cliques
+                total_cota += cota_caso
+                brecha = cliques - cota_caso
+                print(f"Caso {k}: {cliques} cliques, cota {cota_caso}, brecha {brecha} "
+                      f"({100 * brecha / (cota_caso or 1):.2f}%)")
+
+    brecha = total_cliques - total_cota
+    print(f"Total: {total_cliques} cliques, cota {total_cota}, brecha {brecha} "
+          f"({100 * brecha / (total_cota or 1):.2f}%) en los casos válidos, {invalidos} casos inválidos")
+    if invalidos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
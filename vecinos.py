@@ -0,0 +1,273 @@
+from collections import defaultdict
+
+import instrumentacion
+from peptidos import internar_peptidos
+
+# Backend usado cuando grid_neighbors se llama sin `backend`. Los scripts lo
+# cambian con la opción --vecinos de la línea de comandos.
+BACKEND = "python"
+
+BACKENDS = ("python", "numpy")
+
+# Orden en que se recorren las celdas adyacentes. Se respeta en todos los
+# backends para que las listas de vecinos salgan en el mismo orden.
+_DESPLAZAMIENTOS = [(dx, dy) for dx in range(-1, 2) for dy in range(-1, 2)]
+
+
+def grid_neighbors(coords, d, backend=None):
+    """
+    Encuentra los vecinos dentro de una distancia `d` usando una estructura de cuadrícula.
+
+    Devuelve un defaultdict(list) con los índices vecinos de cada punto. El
+    backend "numpy" compara las celdas por bloques con broadcasting; si NumPy
+    no está instalado se usa el recorrido en Python puro.
+    """
+    if backend is None:
+        backend = BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de vecinos desconocido: {backend}")
+
+    if backend == "numpy":
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is not None:
+            return _grid_neighbors_numpy(np, coords, d)
+
+    return _grid_neighbors_python(coords, d)
+
+
+def _grid_neighbors_python(coords, d):
+    grid = defaultdict(list)
+    cell_size = d  # Tamaño de la celda en función de la distancia d
+    d2 = d * d
+
+    # Asigna cada coordenada a una celda en la cuadrícula
+    celdas = []
+    for i, (x, y) in enumerate(coords):
+        celda = (int(x // cell_size), int(y // cell_size))
+        grid[celda].append(i)
+        celdas.append(celda)
+
+    neighbors = defaultdict(list)
+
+    # Para cada célula, buscar vecinos en celdas adyacentes
+    for i, (x, y) in enumerate(coords):
+        cell_x, cell_y = celdas[i]
+        vecinos_i = neighbors[i]
+
+        for dx, dy in _DESPLAZAMIENTOS:
+            # Verifica cada punto en la celda vecina comparando distancias al cuadrado
+            for j in grid.get((cell_x + dx, cell_y + dy), ()):
+                if i != j:
+                    xj, yj = coords[j]
+                    if (x - xj) ** 2 + (y - yj) ** 2 <= d2:
+                        vecinos_i.append(j)
+
+    return neighbors
+
+
+def _grid_neighbors_numpy(np, coords, d):
+    neighbors = defaultdict(list)
+    n = len(coords)
+    if n == 0:
+        return neighbors
+
+    puntos = np.asarray(coords)
+    px, py = puntos[:, 0], puntos[:, 1]
+    cx = np.floor_divide(px, d).astype(np.int64)
+    cy = np.floor_divide(py, d).astype(np.int64)
+    d2 = d * d
+
+    # Cada celda se codifica como un entero; el margen de 1 en cada lado deja
+    # que las celdas adyacentes tengan también una clave válida.
+    cx = cx - cx.min() + 1
+    cy = cy - cy.min() + 1
+    ancho = int(cy.max()) + 2
+    claves = cx * ancho + cy
+
+    # Ordena los puntos por celda; el orden es estable, así que dentro de una
+    # celda los índices quedan crecientes como en la versión en Python.
+    orden = np.argsort(claves, kind="stable")
+    claves_ordenadas = claves[orden]
+
+    pares_i, pares_o, pares_p = [], [], []
+    for o, (dx, dy) in enumerate(_DESPLAZAMIENTOS):
+        objetivo = claves + (dx * ancho + dy)
+        lo = np.searchsorted(claves_ordenadas, objetivo, side="left")
+        hi = np.searchsorted(claves_ordenadas, objetivo, side="right")
+        cuantos = hi - lo
+        total = int(cuantos.sum())
+        if total == 0:
+            continue
+
+        # Expande cada rango [lo, hi) en pares (i, posición en `orden`)
+        i = np.repeat(np.arange(n), cuantos)
+        inicio = np.cumsum(cuantos) - cuantos
+        p = np.arange(total) - np.repeat(inicio, cuantos) + np.repeat(lo, cuantos)
+        j = orden[p]
+
+        ddx = px[i] - px[j]
+        ddy = py[i] - py[j]
+        validos = (ddx * ddx + ddy * ddy <= d2) & (i != j)
+        pares_i.append(i[validos])
+        pares_o.append(np.full(int(validos.sum()), o))
+        pares_p.append(p[validos])
+
+    if not pares_i:
+        return neighbors
+
+    i = np.concatenate(pares_i)
+    o = np.concatenate(pares_o)
+    p = np.concatenate(pares_p)
+    if i.size == 0:
+        return neighbors
+
+    # Agrupa por punto respetando el orden de desplazamientos y de la celda
+    agrupado = np.lexsort((p, o, i))
+    i = i[agrupado]
+    j = orden[p[agrupado]].tolist()
+
+    cortes = np.flatnonzero(np.diff(i)) + 1
+    inicios = [0] + cortes.tolist()
+    fines = cortes.tolist() + [len(j)]
+    for s, e, punto in zip(inicios, fines, i[inicios].tolist()):
+        neighbors[punto] = j[s:e]
+
+    return neighbors
+
+
+# Forma de generar los pares candidatos en vecinos_compatibles: "espacial"
+# recorre la cuadrícula y filtra por péptidos, "peptidos" recorre el índice
+# invertido péptido -> células y filtra por distancia, "auto" elige por caso.
+MODO = "auto"
+
+MODOS = ("auto", "espacial", "peptidos")
+
+
+def vecinos_compatibles(coords, peptidos, d, modo=None):
+    """
+    Encuentra los vecinos a distancia `d` que comparten al menos un péptido.
+
+    Devuelve las mismas listas, en el mismo orden, que grid_neighbors filtrado
+    por péptidos, sea cual sea el modo usado para generar los candidatos.
+    """
+    if modo is None:
+        modo = MODO
+    if modo not in MODOS:
+        raise ValueError(f"Modo de candidatos desconocido: {modo}")
+
+    with instrumentacion.fase("vecinos"):
+        indice = None
+        if modo != "espacial":
+            indice = indice_invertido(peptidos)
+            if modo == "auto":
+                modo = elegir_modo(coords, d, indice)
+
+        if modo == "peptidos":
+            compatibles = _vecinos_por_peptidos(coords, peptidos, d, indice)
+        else:
+            neighbors = grid_neighbors(coords, d)
+            mascaras = internar_peptidos(peptidos)
+            compatibles = defaultdict(list)
+            for i in range(len(coords)):
+                mascara = mascaras[i]
+                compatibles[i] = [j for j in neighbors[i] if mascara & mascaras[j]]
+
+    if instrumentacion.ACTIVA:
+        if modo != "peptidos":
+            # Cada par de celdas adyacentes se compara por distancia y cada
+            # vecino cercano pasa por un AND de máscaras de péptidos.
+            pares = _costo_espacial(coords, d) - len(coords)
+            instrumentacion.contar("pares_candidatos", pares)
+            instrumentacion.contar("distancias", pares)
+            instrumentacion.contar("intersecciones", sum(len(neighbors[i]) for i in range(len(coords))))
+        instrumentacion.contar("aristas", sum(len(compatibles[i]) for i in range(len(coords))) // 2)
+    return compatibles
+
+
+def indice_invertido(peptidos):
+    """
+    Construye el índice péptido -> células que lo tienen, en orden creciente.
+    """
+    indice = defaultdict(list)
+    for i, peptidos_i in enumerate(peptidos):
+        for peptido in peptidos_i:
+            celulas = indice[peptido]
+            if not celulas or celulas[-1] != i:
+                celulas.append(i)
+    return indice
+
+
+def elegir_modo(coords, d, indice):
+    """
+    Elige el modo que examina menos pares candidatos.
+
+    El costo espacial es la suma, por celda de la cuadrícula, de sus puntos por
+    los puntos de las 9 celdas alrededor; el de péptidos es la suma de los
+    cuadrados de las frecuencias de cada péptido.
+    """
+    costo_peptidos = sum(len(celulas) ** 2 for celulas in indice.values())
+
+    return "peptidos" if costo_peptidos < _costo_espacial(coords, d) else "espacial"
+
+
+def _costo_espacial(coords, d):
+    conteo = defaultdict(int)
+    for x, y in coords:
+        conteo[(int(x // d), int(y // d))] += 1
+
+    costo = 0
+    for (cell_x, cell_y), cuantos in conteo.items():
+        alrededor = 0
+        for dx, dy in _DESPLAZAMIENTOS:
+            alrededor += conteo.get((cell_x + dx, cell_y + dy), 0)
+        costo += cuantos * alrededor
+    return costo
+
+
+def _vecinos_por_peptidos(coords, peptidos, d, indice):
+    d2 = d * d
+    celdas = [(int(x // d), int(y // d)) for x, y in coords]
+    visto = [-1] * len(coords)
+    compatibles = defaultdict(list)
+    examinados = distancias = 0
+
+    for i, (x, y) in enumerate(coords):
+        visto[i] = i
+        cell_x, cell_y = celdas[i]
+        candidatos = []
+        for peptido in peptidos[i]:
+            examinados += len(indice[peptido]) - 1
+            for j in indice[peptido]:
+                if visto[j] == i:
+                    continue
+                visto[j] = i
+                distancias += 1
+                xj, yj = coords[j]
+                if (x - xj) ** 2 + (y - yj) ** 2 <= d2:
+                    # Misma clave de orden que el recorrido de la cuadrícula:
+                    # primero la celda adyacente, luego el índice.
+                    dx = celdas[j][0] - cell_x
+                    dy = celdas[j][1] - cell_y
+                    candidatos.append(((dx + 1) * 3 + dy + 1, j))
+        candidatos.sort()
+        compatibles[i] = [j for _, j in candidatos]
+
+    instrumentacion.contar("pares_candidatos", examinados)
+    instrumentacion.contar("distancias", distancias)
+    return compatibles
+
+
+def configurar(backend, modo):
+    """
+    Fija el backend y el modo de candidatos por defecto de este proceso.
+    """
+    global BACKEND, MODO
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de vecinos desconocido: {backend}")
+    if modo not in MODOS:
+        raise ValueError(f"Modo de candidatos desconocido: {modo}")
+    BACKEND = backend
+    MODO = modo